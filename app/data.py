@@ -3,7 +3,9 @@
 from __future__ import annotations
 
 import re
+from bisect import bisect_right
 from dataclasses import dataclass
+from functools import lru_cache
 
 from app.constant import (
     DISH_META_BY_ID as _DISH_META_BY_ID_RAW,
@@ -53,6 +55,17 @@ def print_label_override_for_dish(dish_id: str) -> str | None:
     return meta.print_label
 
 
+NOTE_CATALOG_INDEX: dict[str, int] = {note_id: idx for idx, note_id in enumerate(NOTE_CATALOG)}
+
+
+def ordered_note_ids(note_ids: frozenset[str]) -> list[str]:
+    """Return known note ids from a selection in catalog order."""
+    if not note_ids:
+        return []
+    return sorted((note_id for note_id in note_ids if note_id in NOTE_CATALOG_INDEX), key=NOTE_CATALOG_INDEX.__getitem__)
+
+
+@lru_cache(maxsize=256)
 def print_note_alias_for_id(note_id: str) -> str:
     """Return a compact print alias for a note id."""
     if note_id in NOTE_PRINT_SPICY_SYMBOL_OVERRIDES:
@@ -112,3 +125,85 @@ MENU_BY_MODE: dict[str, list[MenuItem]] = {
 SEARCH_ALIASES_BY_DISH: dict[str, list[str]] = {
     dish_id: list(meta.aliases) for dish_id, meta in DISH_META_BY_ID.items() if meta.aliases
 }
+
+
+class _AlnumOnlyTable(dict):
+    """`str.translate` table deleting non-alphanumerics; filled lazily per code point seen."""
+
+    def __missing__(self, codepoint: int) -> int | None:
+        kept = codepoint if chr(codepoint).isalnum() else None
+        self[codepoint] = kept
+        return kept
+
+
+_ALNUM_ONLY_TABLE = _AlnumOnlyTable()
+
+
+def normalize_search_text(text: str) -> str:
+    """Lowercase and keep only alphanumerics, for query/name matching."""
+    return text.lower().translate(_ALNUM_ONLY_TABLE)
+
+
+# Normalized name, dish id and aliases per menu item, NUL-joined into one record string and
+# computed once at import. Normalized keys are alphanumeric, so a query never matches across the NULs.
+_SEARCH_RECORDS_BY_MODE: dict[str, list[tuple[MenuItem, str]]] = {
+    mode: [
+        (
+            item,
+            "\0".join(
+                (
+                    normalize_search_text(item.name),
+                    normalize_search_text(item.dish_id),
+                    *(normalize_search_text(alias) for alias in SEARCH_ALIASES_BY_DISH.get(item.dish_id, [])),
+                )
+            ),
+        )
+        for item in items
+    ]
+    for mode, items in MENU_BY_MODE.items()
+}
+
+# All records of a mode in one newline-joined buffer, plus each record's start offset, so a
+# full-menu scan is a handful of C-level `str.find` calls instead of a per-item Python loop.
+_SEARCH_BLOB_BY_MODE: dict[str, tuple[str, list[int]]] = {}
+for _mode, _records in _SEARCH_RECORDS_BY_MODE.items():
+    _starts: list[int] = []
+    _offset = 0
+    for _, _record in _records:
+        _starts.append(_offset)
+        _offset += len(_record) + 1
+    _SEARCH_BLOB_BY_MODE[_mode] = ("\n".join(record for _, record in _records), _starts)
+del _mode, _records, _starts, _offset
+
+
+@lru_cache(maxsize=128)
+def filter_menu(mode: str, query: str) -> tuple[MenuItem, ...]:
+    """Return menu items of a mode whose name, id or alias contains the query."""
+    q = normalize_search_text(query)
+    if not q:
+        return tuple(MENU_BY_MODE[mode])
+    return tuple(item for item, _ in _match_search_keys(mode, q))
+
+
+@lru_cache(maxsize=256)
+def _match_search_keys(mode: str, q: str) -> tuple[tuple[MenuItem, str], ...]:
+    if len(q) == 1:
+        return _scan_search_blob(mode, q)
+    # Anything containing `q` also contains `q[:-1]`, so narrow the (usually cached)
+    # matches of the shorter query instead of rescanning the whole menu.
+    return tuple(entry for entry in _match_search_keys(mode, q[:-1]) if q in entry[1])
+
+
+def _scan_search_blob(mode: str, q: str) -> tuple[tuple[MenuItem, str], ...]:
+    blob, starts = _SEARCH_BLOB_BY_MODE[mode]
+    records = _SEARCH_RECORDS_BY_MODE[mode]
+    matches: list[tuple[MenuItem, str]] = []
+    pos = blob.find(q)
+    while pos != -1:
+        idx = bisect_right(starts, pos) - 1
+        matches.append(records[idx])
+        # Resume at the next record so an item that matches twice is emitted once.
+        if idx + 1 == len(starts):
+            break
+        pos = blob.find(q, starts[idx + 1])
+    return tuple(matches)
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
+from typing import ClassVar
 
 
 @dataclass(frozen=True)
@@ -13,22 +14,30 @@ class MenuItem:
     name: str
 
 
-@dataclass
+@dataclass(slots=True)
 class OrderEntry:
     """A registered order row with optional selected notes."""
 
+    # Row-kind tag, so register walks test an attribute instead of calling isinstance.
+    is_group: ClassVar[bool] = False
+
     dish_id: str
     name: str
     mode: str | None = None
-    selected_notes: set[str] = field(default_factory=set)
+    # Immutable so copies and bulk-applied notes can share one object; edits rebind it.
+    selected_notes: frozenset[str] = frozenset()
     custom_notes: list[str] = field(default_factory=list)
     is_takeaway: bool = False
+    # Display group number stamped on submit copies; None for ungrouped rows and live register entries.
+    group_id: int | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class RegisterGroup:
     """A top-level register group containing multiple order rows."""
 
+    is_group: ClassVar[bool] = True
+
     group_id: int
     members: list[OrderEntry]
 
@@ -148,9 +148,9 @@ class NotesModal(ModalScreen[None]):
         if row_kind == self._BUILTIN_KIND:
             note_id = str(row_value)
             if note_id in self.order.selected_notes:
-                self.order.selected_notes.remove(note_id)
+                self.order.selected_notes = self.order.selected_notes - {note_id}
             else:
-                self.order.selected_notes.add(note_id)
+                self.order.selected_notes = self.order.selected_notes | {note_id}
             self._refresh_content()
             return
 
@@ -3,10 +3,12 @@
 from __future__ import annotations
 
 import sqlite3
+import threading
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Iterable
+from typing import Iterable, Iterator
 from uuid import uuid4
 
 from app.config import DB_PATH
@@ -28,17 +30,36 @@ def _utc_now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
-def _connect() -> sqlite3.Connection:
-    db_file = Path(DB_PATH)
-    db_file.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(db_file)
-    conn.execute("PRAGMA foreign_keys = ON")
-    return conn
+_connection: sqlite3.Connection | None = None
+_connection_lock = threading.Lock()
+
+
+@contextmanager
+def _connect() -> Iterator[sqlite3.Connection]:
+    """
+    Yield the shared connection, opening it on first use.
+
+    Calls arrive from background workers, so the connection is not bound to one thread
+    and the lock serializes its users. Reusing it keeps the statement cache warm across submits.
+    """
+    global _connection
+    with _connection_lock:
+        if _connection is None:
+            db_file = Path(DB_PATH)
+            db_file.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(db_file, check_same_thread=False)
+            conn.execute("PRAGMA foreign_keys = ON")
+            # Per-connection setting: under WAL, NORMAL skips the fsync on every commit and stays crash-safe.
+            conn.execute("PRAGMA synchronous = NORMAL")
+            _connection = conn
+        yield _connection
 
 
 def bootstrap_schema() -> None:
     """Create persistence schema if it does not already exist."""
-    with _connect() as conn:
+    with _connect() as conn, conn:
+        # WAL keeps submit commits cheap (no rollback-journal rewrite per commit); the mode persists in the file.
+        conn.execute("PRAGMA journal_mode = WAL")
         conn.executescript(
             """
             CREATE TABLE IF NOT EXISTS orders (
@@ -79,8 +100,13 @@ def bootstrap_schema() -> None:
             conn.execute("ALTER TABLE orders ADD COLUMN order_number INTEGER")
 
 
-def save_order_batch(items: Iterable[OrderEntry], order_number: int) -> SavedOrderBatch:
-    """Persist a full order batch and return saved batch metadata."""
+def save_order_batch(items: Iterable[OrderEntry], order_number: int, status: str = "SAVED") -> SavedOrderBatch:
+    """
+    Persist a full order batch and return saved batch metadata.
+
+    `status` is written with the order row in the same transaction, so callers that
+    already know the expected outcome avoid a second commit via `update_order_status`.
+    """
     if not (0 <= order_number <= 1000):
         raise ValueError("order_number must be between 0 and 1000")
 
@@ -89,7 +115,7 @@ def save_order_batch(items: Iterable[OrderEntry], order_number: int) -> SavedOrd
             dish_id=item.dish_id,
             name=item.name,
             mode=item.mode,
-            selected_notes=set(item.selected_notes),
+            selected_notes=item.selected_notes,
             custom_notes=list(item.custom_notes),
             is_takeaway=item.is_takeaway,
         )
@@ -104,42 +130,40 @@ def save_order_batch(items: Iterable[OrderEntry], order_number: int) -> SavedOrd
     with _connect() as conn:
         with conn:
             conn.execute(
-                "INSERT INTO orders (id, created_at, order_number, source, status) VALUES (?, ?, ?, 'tui', 'SAVED')",
-                (order_id, created_at, order_number),
+                "INSERT INTO orders (id, created_at, order_number, source, status) VALUES (?, ?, ?, 'tui', ?)",
+                (order_id, created_at, order_number, status),
             )
 
-            for idx, item in enumerate(copied_items):
-                cur = conn.execute(
-                    """
-                    INSERT INTO order_items (order_id, line_index, dish_id, dish_name, mode)
-                    VALUES (?, ?, ?, ?, ?)
-                    """,
-                    (order_id, idx, item.dish_id, item.name, item.mode),
-                )
-                order_item_id = int(cur.lastrowid)
+            conn.executemany(
+                """
+                INSERT INTO order_items (order_id, line_index, dish_id, dish_name, mode)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                [(order_id, idx, item.dish_id, item.name, item.mode) for idx, item in enumerate(copied_items)],
+            )
+            # executemany leaves no per-row lastrowid, so map line indexes back to ids in one query.
+            item_ids = dict(
+                conn.execute("SELECT line_index, id FROM order_items WHERE order_id = ?", (order_id,))
+            )
 
+            note_rows: list[tuple[int, str, str]] = []
+            for line_index, item in enumerate(copied_items):
+                order_item_id = item_ids[line_index]
                 for note_id in NOTE_CATALOG:
-                    if note_id not in item.selected_notes:
-                        continue
-                    conn.execute(
-                        """
-                        INSERT INTO order_item_notes (order_item_id, note_id, note_label)
-                        VALUES (?, ?, ?)
-                        """,
-                        (order_item_id, note_id, NOTE_CATALOG[note_id]),
-                    )
-
+                    if note_id in item.selected_notes:
+                        note_rows.append((order_item_id, note_id, NOTE_CATALOG[note_id]))
                 for idx, note_text in enumerate(item.custom_notes):
                     normalized = note_text.strip()
-                    if not normalized:
-                        continue
-                    conn.execute(
-                        """
-                        INSERT INTO order_item_notes (order_item_id, note_id, note_label)
-                        VALUES (?, ?, ?)
-                        """,
-                        (order_item_id, f"custom:{idx}", normalized),
-                    )
+                    if normalized:
+                        note_rows.append((order_item_id, f"custom:{idx}", normalized))
+            if note_rows:
+                conn.executemany(
+                    """
+                    INSERT INTO order_item_notes (order_item_id, note_id, note_label)
+                    VALUES (?, ?, ?)
+                    """,
+                    note_rows,
+                )
 
     return SavedOrderBatch(order_id=order_id, created_at=created_at, order_number=order_number, items=copied_items)
 
@@ -3,7 +3,10 @@
 from __future__ import annotations
 
 import os
+import queue
+import threading
 from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
 from time import sleep
 
@@ -16,7 +19,12 @@ from app.config import (
     PRINTER_USB_VENDOR_ID,
     PRINTER_WIDTH_PX,
 )
-from app.data import NOTE_CATALOG, print_label_override_for_dish, print_note_alias_for_id, print_note_alias_for_text
+from app.data import (
+    ordered_note_ids,
+    print_label_override_for_dish,
+    print_note_alias_for_id,
+    print_note_alias_for_text,
+)
 from app.models import OrderEntry
 
 # Separator tuning values.
@@ -30,6 +38,11 @@ _BAG_OUTLINE_STROKE_PX = 2
 _BAG_EAR_STROKE_PX = 2
 _MAIN_TO_BAG_GAP_PX = 18
 _BAG_TO_BAG_GAP_PX = 12
+# Raster output: match python-escpos' default fragment height for `GS v 0`.
+_RASTER_FRAGMENT_HEIGHT_PX = 960
+_RASTER_INVERT_TABLE = bytes(255 - value for value in range(256))
+# Print order by mode: gimbap, ramyun, untagged (2), then sides.
+_CATEGORY_RANK: dict[str | None, int] = {"G": 0, "R": 1, "S": 3}
 _HEADER_RIGHT_GUTTER_PX = 8
 # Extra vertical headroom for full-size lines to avoid descender clipping on thermal output.
 _MAIN_LINE_EXTRA_PX = 30
@@ -54,6 +67,112 @@ class _GroupedPrintRow:
     group_allocations: dict[int, int] = field(default_factory=dict)
 
 
+class _PrinterQueue:
+    """Feed the printer from a worker thread so rendering overlaps USB transfers.
+
+    Jobs run strictly in submission order; consecutive raster payloads are
+    written together. After the first failure the worker drops the remaining
+    jobs and the error is re-raised to the producer.
+    """
+
+    def __init__(self, printer: object, maxsize: int = 8) -> None:
+        self._printer = printer
+        self._jobs: queue.Queue[tuple[object, tuple[object, ...]] | None] = queue.Queue(maxsize=maxsize)
+        self._error: BaseException | None = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._drain, name="receipt-printer", daemon=True)
+        self._thread.start()
+
+    def _drain(self) -> None:
+        held: list[tuple[object, tuple[object, ...]] | None] = []
+        while True:
+            job = held.pop() if held else self._jobs.get()
+            if job is None:
+                return
+            if self._error is not None:
+                continue
+            func, args = job
+            if func is None:
+                # Merge raster payloads that queued up during the last write into one USB transfer.
+                chunks = [args[0]]
+                while True:
+                    try:
+                        next_job = self._jobs.get_nowait()
+                    except queue.Empty:
+                        break
+                    if next_job is None or next_job[0] is not None:
+                        held.append(next_job)
+                        break
+                    chunks.append(next_job[1][0])
+                func, args = send_raster, (self._printer, b"".join(chunks))
+            try:
+                func(*args)
+            except BaseException as exc:
+                self._error = exc
+
+    def _submit(self, func: object, *args: object) -> None:
+        if self._error is not None:
+            raise self._error
+        self._jobs.put((func, args))
+
+    def image(self, img: object) -> None:
+        if img.mode != "1" or img.width % 8:
+            self._submit(self._printer.image, img)
+            return
+        for payload in raster_payloads(img):
+            # `None` marks a raw raster payload the worker may coalesce.
+            self._submit(None, payload)
+
+    def pause(self, seconds: float) -> None:
+        self._submit(sleep, seconds)
+
+    def cut(self) -> None:
+        self._submit(self._printer.cut)
+
+    def close(self) -> None:
+        """Stop the worker after pending jobs; safe to call more than once."""
+        if self._closed:
+            return
+        self._closed = True
+        self._jobs.put(None)
+        self._thread.join()
+
+    def finish(self) -> None:
+        """Wait for every queued job and surface any printer error."""
+        self.close()
+        if self._error is not None:
+            raise self._error
+
+
+def raster_payloads(img: object) -> list[bytes]:
+    """
+    Build `GS v 0` raster commands straight from a byte-aligned "1" image.
+
+    PIL packs "1" images MSB-first with 1 = white, while ESC/POS wants
+    1 = black, so the packed rows only need a byte-wise invert. This skips
+    python-escpos' RGBA/L/1 conversion for every line we send.
+    """
+    width_bytes = img.width // 8
+    data = img.tobytes().translate(_RASTER_INVERT_TABLE)
+    payloads: list[bytes] = []
+    for top in range(0, img.height, _RASTER_FRAGMENT_HEIGHT_PX):
+        rows = min(_RASTER_FRAGMENT_HEIGHT_PX, img.height - top)
+        header = b"\x1dv0\x00" + width_bytes.to_bytes(2, "little") + rows.to_bytes(2, "little")
+        payloads.append(header + data[top * width_bytes : (top + rows) * width_bytes])
+    return payloads
+
+
+def send_raster(printer: object, payload: bytes) -> None:
+    """
+    Write prebuilt raster bytes straight to the printer.
+
+    python-escpos has no public raw-bytes call, so this relies on the private
+    `Escpos._raw` hook (checked against python-escpos 3.1). Keep every raw write
+    behind this helper so an escpos upgrade that changes it breaks in one place.
+    """
+    printer._raw(payload)
+
+
 def to_print_label(item: OrderEntry) -> str:
     """Format printed line as <Mode>-<BaseName> or plain for untagged rows."""
     override = print_label_override_for_dish(item.dish_id)
@@ -157,7 +276,9 @@ def _render_compact_line(text: str, font: object) -> object:
     return img
 
 
+@lru_cache(maxsize=8)
 def _render_spacer(height_px: int) -> object:
+    # Blank spacers are read-only once handed to the printer, so share them per height.
     from PIL import Image
 
     return Image.new("1", (PRINTER_WIDTH_PX, max(1, height_px)), color=1)
@@ -171,13 +292,15 @@ def _fit_text_to_px(text: str, font: object, max_width_px: int) -> str:
     if draw.textbbox((0, 0), text, font=font)[2] <= max_width_px:
         return text
     ellipsis = "..."
-    trimmed = text
-    while trimmed:
-        candidate = f"{trimmed}{ellipsis}"
-        if draw.textbbox((0, 0), candidate, font=font)[2] <= max_width_px:
-            return candidate
-        trimmed = trimmed[:-1]
-    return ellipsis
+    # Width grows with the kept prefix, so binary-search the longest prefix that still fits.
+    lo, hi = 0, len(text) - 1
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if draw.textbbox((0, 0), f"{text[:mid]}{ellipsis}", font=font)[2] <= max_width_px:
+            lo = mid
+        else:
+            hi = mid - 1
+    return f"{text[:lo]}{ellipsis}"
 
 
 def _is_spicy_symbol_alias(note_label: str) -> bool:
@@ -213,6 +336,19 @@ def _draw_bag_ear(draw: object, center_x: int, baseline_y: int, stroke_width: in
     return loop_height
 
 
+@lru_cache(maxsize=1)
+def _bag_ear_stamp() -> tuple[object, int, int]:
+    """Render the ear once; return its paste mask and offset from (center_x, baseline_y)."""
+    from PIL import Image, ImageDraw
+
+    origin = 64
+    canvas = Image.new("L", (origin * 2, origin * 2), color=255)
+    _draw_bag_ear(ImageDraw.Draw(canvas), origin, origin, stroke_width=_BAG_EAR_STROKE_PX)
+    mask = canvas.point(lambda value: 255 - value)
+    left, top, right, bottom = mask.getbbox()
+    return mask.crop((left, top, right, bottom)), left - origin, top - origin
+
+
 def _render_taw_bag_box(lines: list[str], item_font: object, note_font: object) -> object:
     from PIL import Image, ImageDraw
 
@@ -272,11 +408,18 @@ def _render_taw_bag_box(lines: list[str], item_font: object, note_font: object)
     img_h = y1 + 4
 
     img = Image.new("1", (PRINTER_WIDTH_PX, img_h), color=1)
-    draw = ImageDraw.Draw(img)
 
-    draw.rectangle((x0, y0, x1, y1), outline=0, width=_BAG_OUTLINE_STROKE_PX)
+    # Axis-aligned outline as four filled strokes, then stamp the cached ear.
+    stroke = _BAG_OUTLINE_STROKE_PX
+    img.paste(0, (x0, y0, x1 + 1, y0 + stroke))
+    img.paste(0, (x0, y1 - stroke + 1, x1 + 1, y1 + 1))
+    img.paste(0, (x0, y0, x0 + stroke, y1 + 1))
+    img.paste(0, (x1 - stroke + 1, y0, x1 + 1, y1 + 1))
+    ear_mask, ear_dx, ear_dy = _bag_ear_stamp()
     ear_center_x = x0 + (box_width // 2)
-    _draw_bag_ear(draw, ear_center_x, y0, stroke_width=_BAG_EAR_STROKE_PX)
+    img.paste(0, (ear_center_x + ear_dx, y0 + ear_dy), ear_mask)
+
+    draw = ImageDraw.Draw(img)
 
     y = y0 + pad_y
     text_x = x0 + pad_x
@@ -308,20 +451,30 @@ def _render_section_separator() -> object:
     return img
 
 
-def _print_section_separator(printer: object) -> None:
+@lru_cache(maxsize=1)
+def _section_separator_stripes() -> tuple[object, ...]:
+    """Split the separator into print stripes once; the stripes are never mutated."""
+    separator = _render_section_separator()
+    stripes = []
+    for top in range(0, separator.height, _SECTION_SEPARATOR_STRIPE_HEIGHT_PX):
+        bottom = min(separator.height, top + _SECTION_SEPARATOR_STRIPE_HEIGHT_PX)
+        stripes.append(separator.crop((0, top, PRINTER_WIDTH_PX, bottom)))
+    return tuple(stripes)
+
+
+def _print_section_separator(printer: _PrinterQueue) -> None:
     """
     Print the separator in short stripes with tiny pauses.
 
     This intentionally reduces instantaneous heat so the line stays crisp
     instead of bleeding into adjacent dots.
     """
-    separator = _render_section_separator()
-    for top in range(0, separator.height, _SECTION_SEPARATOR_STRIPE_HEIGHT_PX):
-        bottom = min(separator.height, top + _SECTION_SEPARATOR_STRIPE_HEIGHT_PX)
-        stripe = separator.crop((0, top, PRINTER_WIDTH_PX, bottom))
+    stripes = _section_separator_stripes()
+    last_idx = len(stripes) - 1
+    for idx, stripe in enumerate(stripes):
         printer.image(stripe)
-        if bottom < separator.height:
-            sleep(_SECTION_SEPARATOR_PAUSE_SECONDS)
+        if idx < last_idx:
+            printer.pause(_SECTION_SEPARATOR_PAUSE_SECONDS)
 
 
 def _render_order_number_header(order_number: int, font: object, not_paid: bool = False) -> object:
@@ -367,28 +520,18 @@ def _render_order_number_header(order_number: int, font: object, not_paid: bool
     return img
 
 
-def _print_order_header_phase(printer: object, order_number: int, header_font: object, not_paid: bool) -> None:
+def _print_order_header_phase(printer: _PrinterQueue, order_number: int, header_font: object, not_paid: bool) -> None:
     """Print the order header as an isolated first phase."""
     printer.image(_render_order_number_header(order_number, header_font, not_paid=not_paid))
 
 
-def _category_rank(mode: str | None) -> int:
-    if mode == "G":
-        return 0
-    if mode == "R":
-        return 1
-    if mode == "S":
-        return 3
-    return 2
-
-
 def _group_print_items(items: list[OrderEntry]) -> list[_GroupedPrintRow]:
     """Group by mode+dish+exact built-in/custom note sets and then sort for print."""
     groups: dict[tuple[str | None, str, frozenset[str], frozenset[str], int | None], _GroupedPrintRow] = {}
 
     for idx, item in enumerate(items):
-        source_group_id = getattr(item, "_group_id", None)
-        note_key = frozenset(item.selected_notes)
+        source_group_id = item.group_id
+        note_key = item.selected_notes
         custom_note_key = frozenset(item.custom_notes)
         # `other_side` intentionally does not merge; each row prints individually.
         uniqueness = idx if item.dish_id == "other_side" else None
@@ -413,12 +556,12 @@ def _group_print_items(items: list[OrderEntry]) -> list[_GroupedPrintRow]:
         )
 
     rows = list(groups.values())
-    rows.sort(key=lambda row: (_category_rank(row.item.mode), -row.count, row.first_seen_index))
+    rows.sort(key=lambda row: (_CATEGORY_RANK.get(row.item.mode, 2), -row.count, row.first_seen_index))
     return rows
 
 
 def _ordered_note_labels(note_key: frozenset[str], custom_notes_sorted: tuple[str, ...]) -> list[str]:
-    labels = [print_note_alias_for_id(note_id) for note_id in NOTE_CATALOG if note_id in note_key]
+    labels = [print_note_alias_for_id(note_id) for note_id in ordered_note_ids(note_key)]
     labels.extend(
         aliased for aliased in (print_note_alias_for_text(note_text) for note_text in custom_notes_sorted) if aliased
     )
@@ -448,7 +591,7 @@ def _takeaway_buckets(items: list[OrderEntry]) -> list[tuple[int | None, list[Or
     for item in items:
         if not item.is_takeaway:
             continue
-        group_id = getattr(item, "_group_id", None)
+        group_id = item.group_id
         key = group_id if isinstance(group_id, int) and group_id >= 1 else None
         buckets.setdefault(key, []).append(item)
     grouped_keys = sorted(key for key in buckets if key is not None)
@@ -469,7 +612,6 @@ def print_order_batch(items: list[OrderEntry], order_number: int, not_paid: bool
     except Exception as exc:
         raise RuntimeError(f"Printer dependencies unavailable: {exc}") from exc
 
-    printer = Usb(PRINTER_USB_VENDOR_ID, PRINTER_USB_PRODUCT_ID)
     font_path = resolve_printer_font_path()
     font = ImageFont.truetype(font_path, PRINTER_FONT_SIZE)
     note_font_size = max(10, int(round(PRINTER_FONT_SIZE * 0.75)))
@@ -484,53 +626,59 @@ def print_order_batch(items: list[OrderEntry], order_number: int, not_paid: bool
     takeaway_items = [item for item in items if item.is_takeaway]
     grouped_main_rows = _group_print_items(main_items)
     takeaway_buckets = _takeaway_buckets(takeaway_items)
-    header_needed = (order_number > 0) or bool(not_paid)
-    if header_needed:
-        _print_order_header_phase(printer, order_number, header_font, not_paid)
-    printed_main_s_separator = False
-
-    for row in grouped_main_rows:
-        if row.item.mode == "S" and not printed_main_s_separator:
-            _print_section_separator(printer)
-            printed_main_s_separator = True
-
-        line = _grouped_print_label(row.item, row.count)
-        img = _render_line(line, font)
-        printer.image(img)
-
-        if row.group_allocations:
-            allocation = _group_allocation_line(row.group_allocations)
-            if allocation:
-                printer.image(_render_compact_line(f"    {allocation}", compact_font))
-
-        for note_label in _ordered_note_labels(row.note_key, row.custom_notes_sorted):
-            note_line_font = font if _is_spicy_symbol_alias(note_label) else note_font
-            note_line = _render_note_line(f"    {note_label}", note_line_font)
-            printer.image(note_line)
-
-    for bag_idx, (group_id, bucket_items) in enumerate(takeaway_buckets):
-        if bag_idx == 0 and grouped_main_rows:
-            printer.image(_render_spacer(_MAIN_TO_BAG_GAP_PX))
-        elif bag_idx > 0:
-            printer.image(_render_spacer(_BAG_TO_BAG_GAP_PX))
-
-        bag_rows = _group_print_items(bucket_items)
-        bag_lines: list[str] = []
-        printed_bag_s_separator = False
-        for row in bag_rows:
-            if row.item.mode == "S" and not printed_bag_s_separator:
-                bag_lines.append(_BAG_INLINE_SEPARATOR_TOKEN)
-                printed_bag_s_separator = True
-            bag_lines.append(_grouped_print_label(row.item, row.count))
-            for note_label in _ordered_note_labels(row.note_key, row.custom_notes_sorted):
-                bag_lines.append(f"    {note_label}")
-        printer.image(_render_taw_bag_box(bag_lines, font, note_font))
-        if group_id is not None:
-            printer.image(_render_compact_line(str(group_id), compact_font))
+    # Rendering happens here while the worker thread streams finished images to USB.
+    printer = _PrinterQueue(Usb(PRINTER_USB_VENDOR_ID, PRINTER_USB_PRODUCT_ID))
+    try:
+        header_needed = (order_number > 0) or bool(not_paid)
+        if header_needed:
+            _print_order_header_phase(printer, order_number, header_font, not_paid)
+        printed_main_s_separator = False
+
+        for row in grouped_main_rows:
+            if row.item.mode == "S" and not printed_main_s_separator:
+                _print_section_separator(printer)
+                printed_main_s_separator = True
 
-    # Give single-line tickets a minimal extra tail for easier tearing.
-    bag_grouped_count_total = sum(len(_group_print_items(bucket_items)) for _, bucket_items in takeaway_buckets)
-    if len(grouped_main_rows) == 1 or (len(grouped_main_rows) == 0 and bag_grouped_count_total == 1):
-        printer.image(_render_spacer(PRINTER_SINGLE_ITEM_SPACER_PX))
+            line = _grouped_print_label(row.item, row.count)
+            img = _render_line(line, font)
+            printer.image(img)
 
-    printer.cut()
+            if row.group_allocations:
+                allocation = _group_allocation_line(row.group_allocations)
+                if allocation:
+                    printer.image(_render_compact_line(f"    {allocation}", compact_font))
+
+            for note_label in _ordered_note_labels(row.note_key, row.custom_notes_sorted):
+                note_line_font = font if _is_spicy_symbol_alias(note_label) else note_font
+                note_line = _render_note_line(f"    {note_label}", note_line_font)
+                printer.image(note_line)
+
+        for bag_idx, (group_id, bucket_items) in enumerate(takeaway_buckets):
+            if bag_idx == 0 and grouped_main_rows:
+                printer.image(_render_spacer(_MAIN_TO_BAG_GAP_PX))
+            elif bag_idx > 0:
+                printer.image(_render_spacer(_BAG_TO_BAG_GAP_PX))
+
+            bag_rows = _group_print_items(bucket_items)
+            bag_lines: list[str] = []
+            printed_bag_s_separator = False
+            for row in bag_rows:
+                if row.item.mode == "S" and not printed_bag_s_separator:
+                    bag_lines.append(_BAG_INLINE_SEPARATOR_TOKEN)
+                    printed_bag_s_separator = True
+                bag_lines.append(_grouped_print_label(row.item, row.count))
+                for note_label in _ordered_note_labels(row.note_key, row.custom_notes_sorted):
+                    bag_lines.append(f"    {note_label}")
+            printer.image(_render_taw_bag_box(bag_lines, font, note_font))
+            if group_id is not None:
+                printer.image(_render_compact_line(str(group_id), compact_font))
+
+        # Give single-line tickets a minimal extra tail for easier tearing.
+        bag_grouped_count_total = sum(len(_group_print_items(bucket_items)) for _, bucket_items in takeaway_buckets)
+        if len(grouped_main_rows) == 1 or (len(grouped_main_rows) == 0 and bag_grouped_count_total == 1):
+            printer.image(_render_spacer(PRINTER_SINGLE_ITEM_SPACER_PX))
+
+        printer.cut()
+        printer.finish()
+    finally:
+        printer.close()
@@ -2,27 +2,47 @@
 
 from __future__ import annotations
 
-from datetime import datetime, timezone
+import os
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
 from pathlib import Path
+from time import time_ns
+from typing import Callable, TextIO
 
-from rich.text import Text
+from rich.style import Style
+from rich.text import Span, Text
 from textual.app import App, ComposeResult
 from textual.binding import Binding
 from textual.containers import Horizontal, Vertical
-from textual.css.query import NoMatches
 from textual.events import Key
-from textual.reactive import reactive
+from textual.reactive import var
+from textual.timer import Timer
 from textual.widgets import Header, Static
 
-from app.data import MENU_BY_MODE, SEARCH_ALIASES_BY_DISH, display_name_for_dish
+from app.data import display_name_for_dish, filter_menu
 from app.models import MenuItem, OrderConfirmData, OrderEntry, RegisterGroup, RegisterRow
 from app.notes_modal import NotesModal
 from app.order_number_modal import OrderNumberModal
-from app.persistence import bootstrap_schema, save_order_batch, update_order_status
-from app.printer import check_printer_dependencies, print_order_batch
 from app.rendering import badge_style, format_all_note_tags, format_order_label
 
 
+# Coalesce pane re-renders triggered by key bursts into one per ~60 fps frame.
+_REFRESH_INTERVAL_SECONDS = 0.016
+_DEBUG_ENV = "RECEIPT_DEBUG"
+_DEBUG_LOG_FLUSH_SECONDS = 1.0
+_DEBUG_LOG_BUFFER_LINES = 4096
+# Off-screen markers shared by the orders and results panes; the style is parsed once here.
+_ELLIPSIS_STYLE = Style(dim=True)
+_TOP_ELLIPSIS = "⋮\n"
+_BOTTOM_ELLIPSIS = "\n⋮"
+_TOP_ELLIPSIS_SPAN = Span(0, len(_TOP_ELLIPSIS), _ELLIPSIS_STYLE)
+
+
+def _format_log_timestamp(ts_ns: int) -> str:
+    return (datetime(1970, 1, 1, tzinfo=timezone.utc) + timedelta(microseconds=ts_ns // 1000)).isoformat()
+
+
 class ReceiptOrderApp(App):
     """A Textual app for searching and registering restaurant order items."""
 
@@ -80,17 +100,21 @@ class ReceiptOrderApp(App):
     }
     """
 
-    input_state = reactive("normal")
-    ui_mode = reactive("NORMAL")
-    view_mode_active = reactive(False)
-    view_anchor_index = reactive(None)
-    view_cursor_index = reactive(None)
-    view_selection_kind = reactive("CHAR")
-    mode = reactive("G")
-    query = reactive("")
-    selected_index = reactive(0)
-    order_selected_index = reactive(None)
-    order_selected_member_index = reactive(None)
+    # Plain `var`s: panes are redrawn explicitly through the dirty-flag flush, so assignments
+    # must not also schedule an app-wide repaint each (handlers often set several in a row).
+    input_state = var("normal")
+    ui_mode = var("NORMAL")
+    view_mode_active = var(False)
+    view_anchor_index = var(None)
+    view_cursor_index = var(None)
+    view_selection_kind = var("CHAR")
+    mode = var("G")
+    query = var("")
+    selected_index = var(0)
+    order_selected_index = var(None)
+    order_selected_member_index = var(None)
+    # Shown under the search hint in NORMAL mode; `watch_system_status` repaints just the search bar.
+    system_status = var("")
 
     BINDINGS = [
         ("tab", "cycle_results(1)", "Next result"),
@@ -106,7 +130,6 @@ class ReceiptOrderApp(App):
     def __init__(self) -> None:
         super().__init__()
         self.registered_orders: list[RegisterRow] = []
-        self.system_status = ""
         self.s_other_typing_active = False
         self.s_other_input_value = ""
         self.view_pending_g = False
@@ -116,19 +139,89 @@ class ReceiptOrderApp(App):
         self.view_member_cursor_index = None
         self.next_group_id = 1
         self._bulk_note_targets: list[OrderEntry] | None = None
+        self._modal_open = False
+        self._storage_ready = False
+        self._submit_in_flight = False
+        self._submitted_rows: list[RegisterRow] = []
+        # (row index, member index) selected when the register was cleared for submit.
+        self._submitted_selection: tuple[int | None, int | None] = (None, None)
+        # Per-pane dirty flags; `_flush_refresh` renders only flagged panes, at most once per frame.
+        self._orders_dirty = False
+        self._search_bar_dirty = False
+        self._results_dirty = False
+        self._footer_dirty = False
+        self._refresh_timer: Timer | None = None
+        # Pane widgets are looked up once in `on_mount` instead of on every render.
+        self._orders_widget: Static | None = None
+        self._search_bar_widget: Static | None = None
+        self._results_widget: Static | None = None
+        self._footer_widget: Static | None = None
+        # (input state, mode, query, status) of the last search-bar update; unchanged bars are not re-sent.
+        self._search_bar_state: tuple[str, str, str, str] | None = None
+        # Last results render: (results, start, end, body, row offsets, spans, pointer index).
+        self._results_render_cache: tuple[tuple[MenuItem, ...], int, int, str, list[int], tuple[Span, ...], int] | None = None
+        # Bumped on every register content change; keys the per-row render cache.
+        self._orders_version = 0
+        self._order_row_cache: dict[int, tuple[str, tuple[Span, ...], int, list[tuple[int, int, int]]]] = {}
+        self._order_row_cache_version = -1
+        # Last assembled orders body keyed by (orders version, window start, window end).
+        self._orders_body_cache: (
+            tuple[tuple[int, int, int], str, tuple[Span, ...], list[tuple[int, bool, int, int, int, list[tuple[int, int, int]]]]]
+            | None
+        ) = None
+        self._selection_path: list[tuple[int, int | None]] = []
+        self._selection_path_index: dict[tuple[int, int | None], int] = {}
+        self._group_display: dict[int, int] = {}
+        self._flat_items: tuple[OrderEntry, ...] = ()
+        self._row_kinds_cache = bytearray()
+        self._row_kinds_version = -1
+        self._item_display_prefix_cache: list[int] = [0]
+        self._item_display_prefix_version = -1
+        self._normalized_selection_key: tuple[int, int | None, int | None] | None = None
+        self._flat_items_version = -1
+        self._group_display_version = -1
+        self._selection_path_version = -1
         self._debug_log_path = Path("/tmp/receipt-debug.log")
+        # Debug logging is opt-in; when enabled, lines are buffered and written by `_flush_debug_log`.
+        self._debug_enabled = bool(os.environ.get(_DEBUG_ENV))
+        self._debug_log_buffer: deque[tuple[int, str, tuple[object, ...]]] = deque(maxlen=_DEBUG_LOG_BUFFER_LINES)
+        self._debug_log_fh: TextIO | None = None
         self._log_debug("app_init")
 
-    def _log_debug(self, message: str) -> None:
+    def _log_debug(self, message: str, *args: object) -> None:
+        # Like stdlib logging, `message % args` is only formatted when the buffer is flushed,
+        # so disabled or hot-path calls never pay for repr/str of their arguments.
+        if not self._debug_enabled:
+            return
+        self._debug_log_buffer.append((time_ns(), message, args))
+
+    def _flush_debug_log(self) -> None:
+        if not self._debug_log_buffer:
+            return
+        lines = [
+            f"{_format_log_timestamp(ts_ns)} {message % args if args else message}\n"
+            for ts_ns, message, args in self._debug_log_buffer
+        ]
+        self._debug_log_buffer.clear()
         try:
-            ts = datetime.now(timezone.utc).isoformat()
-            self._debug_log_path.parent.mkdir(parents=True, exist_ok=True)
-            with self._debug_log_path.open("a", encoding="utf-8") as fh:
-                fh.write(f"{ts} {message}\n")
+            if self._debug_log_fh is None:
+                self._debug_log_path.parent.mkdir(parents=True, exist_ok=True)
+                self._debug_log_fh = self._debug_log_path.open("a", encoding="utf-8")
+            self._debug_log_fh.writelines(lines)
+            self._debug_log_fh.flush()
         except Exception:
             # Logging must never interfere with app flow.
             return
 
+    def _close_debug_log(self) -> None:
+        self._flush_debug_log()
+        if self._debug_log_fh is not None:
+            try:
+                self._debug_log_fh.close()
+            except Exception:
+                pass
+            self._debug_log_fh = None
+
     def compose(self) -> ComposeResult:
         yield Header()
         with Horizontal(id="main-layout"):
@@ -141,15 +234,51 @@ class ReceiptOrderApp(App):
         yield Static(id="mode-footer")
 
     def on_mount(self) -> None:
-        bootstrap_schema()
-        _, msg = check_printer_dependencies()
-        self.system_status = msg
-        self._log_debug(f"on_mount printer_status={msg!r}")
+        self._orders_widget = self.query_one("#orders-list", Static)
+        self._search_bar_widget = self.query_one("#search-bar", Static)
+        self._results_widget = self.query_one("#results", Static)
+        self._footer_widget = self.query_one("#mode-footer", Static)
+        # Paint immediately; schema setup and printer probing run on a worker thread.
+        self.system_status = "Starting..."
         self._sync_ui_mode()
         self._refresh_all()
+        self.run_worker(self._bootstrap_in_background, thread=True, name="bootstrap")
+        if self._debug_enabled:
+            self.set_interval(_DEBUG_LOG_FLUSH_SECONDS, self._flush_debug_log)
+
+    def _bootstrap_in_background(self) -> None:
+        # sqlite/uuid and the printer module are imported here, on the worker thread, so they stay
+        # off the startup path before the first paint.
+        from app.persistence import bootstrap_schema
+        from app.printer import check_printer_dependencies
+
+        try:
+            bootstrap_schema()
+        except Exception as exc:
+            self.call_from_thread(self._on_bootstrap_done, False, f"Database unavailable: {exc}")
+            return
+        _, msg = check_printer_dependencies()
+        self.call_from_thread(self._on_bootstrap_done, True, msg)
+
+    def _on_bootstrap_done(self, storage_ready: bool, msg: str) -> None:
+        self._storage_ready = storage_ready
+        self.system_status = msg
+        self._log_debug("on_mount printer_status=%r storage_ready=%s", msg, storage_ready)
+
+    def on_resize(self) -> None:
+        # Visible row counts change with the terminal size; re-window both lists after layout.
+        self.call_after_refresh(self._refresh_visible_windows)
+
+    def _refresh_visible_windows(self) -> None:
+        self._orders_dirty = True
+        self._results_dirty = True
+        self._schedule_refresh()
+
+    def on_unmount(self) -> None:
+        self._close_debug_log()
 
     def on_key(self, event: Key) -> None:
-        if isinstance(self.screen, (NotesModal, OrderNumberModal)):
+        if self._modal_open:
             self._sync_ui_mode()
             return
 
@@ -160,7 +289,7 @@ class ReceiptOrderApp(App):
                 return
             if event.is_printable and event.character and len(event.character) == 1:
                 self.s_other_input_value += event.character
-                self._refresh_results(self._filtered_results())
+                self._refresh_results()
                 event.stop()
                 return
             # Ignore navigation/other non-text keys while typing custom side item.
@@ -168,7 +297,7 @@ class ReceiptOrderApp(App):
             return
 
         self._log_debug(
-            f"on_key key={event.key!r} char={event.character!r} printable={event.is_printable} state={self.input_state!r}"
+            "on_key key=%r char=%r printable=%s state=%r", event.key, event.character, event.is_printable, self.input_state
         )
 
         if self.view_mode_active:
@@ -177,60 +306,8 @@ class ReceiptOrderApp(App):
                 event.stop()
                 return
             if event.is_printable and event.character and len(event.character) == 1:
-                if event.character == "N":
-                    self._clear_view_pending_g()
-                    self._open_notes_for_view_selection()
-                    event.stop()
-                    return
-                if event.character == "A":
-                    self._clear_view_pending_g()
-                    self._toggle_takeaway_whole_order()
-                    event.stop()
-                    return
-                if event.character == "J":
-                    self._clear_view_pending_g()
-                    self._reorder_view_selection_block(1)
-                    event.stop()
-                    return
-                if event.character == "K":
-                    self._clear_view_pending_g()
-                    self._reorder_view_selection_block(-1)
-                    event.stop()
-                    return
-                if event.character == "C":
-                    self._clear_view_pending_g()
-                    self._ungroup_selected_group()
-                    event.stop()
-                    return
-                if event.character == "G":
-                    self._clear_view_pending_g()
-                    self._jump_view_cursor_to_bottom()
-                    self._log_debug("view_mode_jump_bottom_G")
-                    event.stop()
-                    return
-
-                key = event.character.lower()
-                if key == "c":
-                    self._clear_view_pending_g()
-                    self._group_selected_rows()
-                    event.stop()
-                    return
-                if key == "d":
-                    self._clear_view_pending_g()
-                    self._delete_view_selected_rows()
-                    event.stop()
-                    return
-                if key == "n":
-                    self._clear_view_pending_g()
-                    self._open_notes_for_view_selection()
-                    event.stop()
-                    return
-                if key == "a":
-                    self._clear_view_pending_g()
-                    self._toggle_takeaway_selection()
-                    event.stop()
-                    return
-                if key == "g":
+                # `g` is stateful (gg jumps to top); every other view key first drops a pending `g`.
+                if event.character == "g":
                     if self.view_pending_g:
                         self._clear_view_pending_g()
                         self._jump_view_cursor_to_top()
@@ -240,14 +317,10 @@ class ReceiptOrderApp(App):
                         self._log_debug("view_mode_g_pending")
                     event.stop()
                     return
-                if key == "j":
-                    self._clear_view_pending_g()
-                    self._move_view_cursor(1)
-                    event.stop()
-                    return
-                if key == "k":
+                handler = self._VIEW_KEY_DISPATCH.get(event.character)
+                if handler is not None:
                     self._clear_view_pending_g()
-                    self._move_view_cursor(-1)
+                    handler(self)
                     event.stop()
                     return
             self._clear_view_pending_g()
@@ -263,83 +336,12 @@ class ReceiptOrderApp(App):
         if not event.is_printable or len(event.character) != 1 or not event.character.isalnum():
             return
 
-        key = event.character.lower()
         if self.input_state == "normal":
-            if key == "v":
-                if event.character == "V":
-                    self.view_selection_kind = "LINE"
-                    self.system_status = "Shift+V not implemented yet"
-                    self._refresh_search()
-                    self._log_debug("view_mode_shift_v_stub")
-                    event.stop()
-                    return
-                self._enter_view_mode()
-                event.stop()
-                return
-
-            if key == "c":
-                if event.character == "C":
-                    self._ungroup_selected_group()
-                else:
-                    self._group_selected_rows()
-                event.stop()
-                return
-
-            if key == "a":
-                if event.character == "A":
-                    self._toggle_takeaway_whole_order()
-                else:
-                    self._toggle_takeaway_selection()
-                event.stop()
-                return
-
-            if key == "t":
-                self.registered_orders.append(OrderEntry(dish_id="tteokbokki", name=display_name_for_dish("tteokbokki")))
-                self.order_selected_index = len(self.registered_orders) - 1
-                self.order_selected_member_index = None
-                self._refresh_orders()
-                event.stop()
-                return
-
-            if key == "d":
-                self._delete_selected_order()
-                event.stop()
-                return
-
-            if event.character == "J":
-                self._reorder_selected_row(1)
-                event.stop()
-                return
-
-            if event.character == "K":
-                self._reorder_selected_row(-1)
-                event.stop()
-                return
-
-            if key == "j":
-                self._move_order_selection(1)
-                event.stop()
-                return
-
-            if key == "k":
-                self._move_order_selection(-1)
-                event.stop()
+            # Keyed on the raw character: case-sensitive pairs (v/V, c/C, a/A, j/J, k/K) get their own entries.
+            handler = self._NORMAL_KEY_DISPATCH.get(event.character)
+            if handler is None:
                 return
-
-            if key == "n":
-                self._open_notes_for_selected_order()
-                event.stop()
-                return
-
-            if key not in {"g", "r", "s"}:
-                return
-
-            self.mode = key.upper()
-            self.input_state = "active"
-            self._sync_ui_mode()
-            self.query = ""
-            self.selected_index = 0
-            self._refresh_search()
+            handler(self, event.character)
             event.stop()
             return
 
@@ -349,7 +351,7 @@ class ReceiptOrderApp(App):
         event.stop()
 
     def action_cancel_active_mode(self) -> None:
-        if isinstance(self.screen, NotesModal):
+        if self._modal_open:
             return
         if self.input_state == "active" and self.mode == "S" and self.s_other_typing_active:
             self._cancel_s_other_typing(clear_input=True)
@@ -365,7 +367,7 @@ class ReceiptOrderApp(App):
         self._refresh_search()
 
     def action_cycle_results(self, delta: int) -> None:
-        if isinstance(self.screen, NotesModal):
+        if self._modal_open:
             return
         if self.input_state != "active":
             return
@@ -374,14 +376,15 @@ class ReceiptOrderApp(App):
 
         results = self._filtered_results()
         if not results:
-            self.selected_index = 0
-            self._refresh_results(results)
+            if self.selected_index != 0:
+                self.selected_index = 0
+                self._refresh_results()
             return
         self.selected_index = (self.selected_index + delta) % len(results)
-        self._refresh_results(results)
+        self._refresh_results()
 
     def action_register_selected(self) -> None:
-        if isinstance(self.screen, NotesModal):
+        if self._modal_open:
             return
         if self.input_state != "active":
             return
@@ -399,20 +402,21 @@ class ReceiptOrderApp(App):
 
         item = results[self.selected_index]
         self.registered_orders.append(OrderEntry(dish_id=item.dish_id, name=item.name, mode=self.mode))
+        self._mark_orders_changed()
         self.order_selected_index = len(self.registered_orders) - 1
         self.order_selected_member_index = None
         self._cancel_s_other_typing(clear_input=True)
         self._refresh_orders()
 
     def action_backspace_query(self) -> None:
-        if isinstance(self.screen, NotesModal):
+        if self._modal_open:
             return
         if self.input_state != "active":
             return
         if self.input_state == "active" and self.mode == "S" and self.s_other_typing_active:
             if self.s_other_input_value:
                 self.s_other_input_value = self.s_other_input_value[:-1]
-                self._refresh_results(self._filtered_results())
+                self._refresh_results()
             return
 
         if not self.query:
@@ -423,91 +427,173 @@ class ReceiptOrderApp(App):
 
     def action_submit_and_print(self) -> None:
         self._log_debug(
-            f"submit_enter state={self.input_state!r} rows={len(self.registered_orders)} screen={type(self.screen).__name__}"
+            "submit_enter state=%r rows=%d screen=%s", self.input_state, len(self.registered_orders), type(self.screen).__name__
         )
-        if isinstance(self.screen, NotesModal):
+        if self._modal_open:
             self._log_debug("submit_blocked reason=notes_modal")
             return
         if self.input_state != "normal":
             self.system_status = "Submit only in NORMAL mode (Ctrl+C to exit active)"
-            self._refresh_search()
             self._log_debug("submit_blocked reason=not_normal")
             return
         if not self.registered_orders:
             self.system_status = "Nothing to submit"
-            self._refresh_search()
             self._log_debug("submit_blocked reason=no_rows")
             return
+        if self._submit_in_flight:
+            self.system_status = "Previous submit still in progress"
+            self._log_debug("submit_blocked reason=in_flight")
+            return
+        if not self._storage_ready:
+            if self.system_status == "Starting...":
+                self.system_status = "Still starting, try again in a moment"
+            self._log_debug("submit_blocked reason=storage_not_ready")
+            return
 
-        self.ui_mode = "MODAL"
-        self.push_screen(OrderNumberModal(), self._on_order_number_selected)
+        # Paint any pending pane updates before the modal covers them.
+        self._flush_refresh()
+        self._push_modal(OrderNumberModal(), self._on_order_number_selected)
 
     def _on_order_number_selected(self, result: OrderConfirmData | None) -> None:
+        self._modal_open = False
         self._sync_ui_mode()
         if result is None:
             self.system_status = "Submit canceled"
-            self._refresh_search()
             self._log_debug("submit_canceled reason=no_order_number")
             return
         self._log_debug(
-            f"submit_order_number_selected order_number={result.order_number} not_paid={result.not_paid}"
+            "submit_order_number_selected order_number=%d not_paid=%s", result.order_number, result.not_paid
         )
         self._submit_with_order_number(result.order_number, result.not_paid)
 
     def _submit_with_order_number(self, order_number: int, not_paid: bool) -> None:
         flat_items = self._flatten_register_rows_for_submit()
-        batch = save_order_batch(flat_items, order_number)
+        # Clear the register optimistically; `_on_submit_failed` puts the rows back if save/print fails.
+        self._submit_in_flight = True
+        self._submitted_rows = list(self.registered_orders)
+        self._submitted_selection = (self.order_selected_index, self.order_selected_member_index)
+        self.registered_orders.clear()
+        self._mark_orders_changed()
+        self.order_selected_index = None
+        self.order_selected_member_index = None
+        self.system_status = "Submitting..."
+        self._refresh_orders()
+        self.run_worker(
+            lambda: self._submit_in_background(flat_items, order_number, not_paid),
+            thread=True,
+            name="submit",
+            exclusive=True,
+        )
+
+    def _submit_in_background(self, flat_items: list[OrderEntry], order_number: int, not_paid: bool) -> None:
+        from app.persistence import save_order_batch, update_order_status
+        from app.printer import print_order_batch
+
+        try:
+            # Saved as PRINTED up front; only a failed print needs a second write.
+            batch = save_order_batch(flat_items, order_number, status="PRINTED")
+        except Exception as exc:
+            self.call_from_thread(self._on_submit_failed, f"Save failed: {exc}", f"submit_save_failed error={exc!r}")
+            return
         self._log_debug(
-            f"submit_saved order_id={batch.order_id} order_number={batch.order_number} not_paid={not_paid} rows={len(flat_items)}"
+            "submit_saved order_id=%s order_number=%d not_paid=%s rows=%d",
+            batch.order_id,
+            batch.order_number,
+            not_paid,
+            len(flat_items),
         )
         try:
             print_order_batch(flat_items, batch.order_number, not_paid=not_paid)
         except Exception as exc:
-            update_order_status(batch.order_id, "PRINT_FAILED")
-            self.system_status = f"Saved {batch.order_id[:8]} but print failed: {exc}"
-            self._refresh_search()
-            self._log_debug(f"submit_print_failed order_id={batch.order_id} error={exc!r}")
+            status = f"Saved {batch.order_id[:8]} but print failed: {exc}"
+            try:
+                update_order_status(batch.order_id, "PRINT_FAILED")
+            except Exception as status_exc:
+                # The row stays recorded as PRINTED; make that visible instead of dropping the error.
+                self._log_debug(
+                    "submit_status_update_failed order_id=%s error=%r", batch.order_id, status_exc
+                )
+                status = f"{status}; status NOT updated: {status_exc}"
+            self.call_from_thread(
+                self._on_submit_failed,
+                status,
+                f"submit_print_failed order_id={batch.order_id} error={exc!r}",
+            )
             return
 
-        update_order_status(batch.order_id, "PRINTED")
-        self.registered_orders.clear()
-        self.order_selected_index = None
-        self.order_selected_member_index = None
-        self.next_group_id = 1
-        self.system_status = f"Saved + printed: {batch.order_id[:8]}"
+        self.call_from_thread(self._on_submit_printed, batch.order_id)
+
+    def _on_submit_printed(self, order_id: str) -> None:
+        self._submit_in_flight = False
+        self._submitted_rows = []
+        self.system_status = f"Saved + printed: {order_id[:8]}"
+        self._log_debug("submit_printed order_id=%s", order_id)
+
+    def _on_submit_failed(self, status: str, log_message: str) -> None:
+        self._submit_in_flight = False
+        self._restore_submitted_rows()
+        self.system_status = status
+        self._log_debug(log_message)
+
+    def _restore_submitted_rows(self) -> None:
+        """Put rows back after a failed submit, ahead of anything registered meanwhile."""
+        restored = self._submitted_rows
+        self._submitted_rows = []
+        if not restored:
+            return
+        self._exit_view_mode()
+        had_rows = bool(self.registered_orders)
+        self.registered_orders[0:0] = restored
+        self._mark_orders_changed()
+        if had_rows and self.order_selected_index is not None:
+            self.order_selected_index += len(restored)
+        elif had_rows:
+            self.order_selected_index = 0
+            self.order_selected_member_index = None
+        else:
+            # Nothing was registered meanwhile: put the cursor back where the submit left it.
+            self.order_selected_index, self.order_selected_member_index = self._submitted_selection
         self._refresh_orders()
-        self._refresh_search()
-        self._log_debug(f"submit_printed order_id={batch.order_id}")
-
-    def _filtered_results(self) -> list[MenuItem]:
-        source = MENU_BY_MODE[self.mode]
-        if not self.query:
-            return source
-        q = self._normalize_search_text(self.query)
-        if not q:
-            return source
 
-        matched: list[MenuItem] = []
-        for item in source:
-            normalized_name = self._normalize_search_text(item.name)
-            normalized_dish_id = self._normalize_search_text(item.dish_id)
-            if q in normalized_name or q in normalized_dish_id:
-                matched.append(item)
-                continue
-
-            aliases = SEARCH_ALIASES_BY_DISH.get(item.dish_id, [])
-            if any(q in self._normalize_search_text(alias) for alias in aliases):
-                matched.append(item)
-
-        return matched
-
-    def _normalize_search_text(self, text: str) -> str:
-        return "".join(ch for ch in text.lower() if ch.isalnum())
+    def _filtered_results(self) -> tuple[MenuItem, ...]:
+        # Menu data is static, so results are memoized per (mode, query) in `filter_menu`.
+        return filter_menu(self.mode, self.query)
 
     def _refresh_all(self) -> None:
         self._refresh_orders()
         self._refresh_search()
         self._refresh_footer()
+        self._flush_refresh()
+
+    def _schedule_refresh(self) -> None:
+        if self._refresh_timer is None:
+            self._refresh_timer = self.set_timer(_REFRESH_INTERVAL_SECONDS, self._flush_refresh)
+
+    def _flush_refresh(self) -> None:
+        """Render every pane marked dirty since the last flush."""
+        if self._refresh_timer is not None:
+            self._refresh_timer.stop()
+            self._refresh_timer = None
+        if self._orders_widget is None:
+            return
+        # One batch so panes updated together reach the terminal in a single paint.
+        with self.batch_update():
+            if self._orders_dirty:
+                self._orders_dirty = False
+                self._render_orders()
+            if self._search_bar_dirty:
+                self._search_bar_dirty = False
+                self._render_search_bar()
+            if self._results_dirty:
+                self._results_dirty = False
+                self._render_results()
+            if self._footer_dirty:
+                self._footer_dirty = False
+                self._render_footer()
+
+    def watch_system_status(self, _new_status: str) -> None:
+        self._search_bar_dirty = True
+        self._schedule_refresh()
 
     def watch_ui_mode(self, _new_mode: str) -> None:
         self._refresh_footer()
@@ -531,7 +617,7 @@ class ReceiptOrderApp(App):
         path = self._selection_path_list()
         if not path:
             return
-        current_path_idx = self._current_selection_path_index(path)
+        current_path_idx = self._current_selection_path_index()
         if current_path_idx is None:
             current_path_idx = 0 if delta > 0 else len(path) - 1
         else:
@@ -540,26 +626,29 @@ class ReceiptOrderApp(App):
         self._refresh_orders()
 
     def _selection_path_list(self) -> list[tuple[int, int | None]]:
+        """Return every selectable (row, member) stop in order; rebuilt only when the register changes."""
+        if self._selection_path_version == self._orders_version:
+            return self._selection_path
         path: list[tuple[int, int | None]] = []
         for idx, row in enumerate(self.registered_orders):
             path.append((idx, None))
-            if isinstance(row, RegisterGroup):
+            if row.is_group:
                 for member_idx in range(len(row.members)):
                     path.append((idx, member_idx))
+        self._selection_path = path
+        self._selection_path_index = {stop: path_idx for path_idx, stop in enumerate(path)}
+        self._selection_path_version = self._orders_version
         return path
 
-    def _current_selection_path_index(self, path: list[tuple[int, int | None]]) -> int | None:
+    def _current_selection_path_index(self) -> int | None:
+        # Relies on `_selection_path_list()` having refreshed the reverse index for this version.
         if self.order_selected_index is None:
             return None
-        current = (self.order_selected_index, self.order_selected_member_index)
-        try:
-            return path.index(current)
-        except ValueError:
-            fallback = (self.order_selected_index, None)
-            try:
-                return path.index(fallback)
-            except ValueError:
-                return None
+        path_index = self._selection_path_index
+        current_path_idx = path_index.get((self.order_selected_index, self.order_selected_member_index))
+        if current_path_idx is None:
+            current_path_idx = path_index.get((self.order_selected_index, None))
+        return current_path_idx
 
     def _set_selection_path(self, path_entry: tuple[int, int | None]) -> None:
         self.order_selected_index, self.order_selected_member_index = path_entry
@@ -570,7 +659,7 @@ class ReceiptOrderApp(App):
         if not (0 <= self.order_selected_index < len(self.registered_orders)):
             return None
         row = self.registered_orders[self.order_selected_index]
-        if not isinstance(row, RegisterGroup):
+        if not row.is_group:
             return None
         if not (0 <= self.order_selected_member_index < len(row.members)):
             return None
@@ -598,6 +687,7 @@ class ReceiptOrderApp(App):
             self.registered_orders[dst],
             self.registered_orders[src],
         )
+        self._mark_orders_changed()
         self.order_selected_index = dst
         self.order_selected_member_index = None
         self._refresh_orders()
@@ -612,15 +702,17 @@ class ReceiptOrderApp(App):
         dst_start = start + delta
         dst_end = end + delta
         if dst_start < 0 or dst_end >= len(self.registered_orders):
-            self._log_debug(
-                f"view_reorder_noop reason=boundary start={start} end={end} delta={delta}"
-            )
+            self._log_debug("view_reorder_noop reason=boundary start=%d end=%d delta=%d", start, end, delta)
             return
 
-        block = self.registered_orders[start : end + 1]
-        del self.registered_orders[start : end + 1]
-        insert_at = start + 1 if delta > 0 else start - 1
-        self.registered_orders[insert_at:insert_at] = block
+        # A one-step move just rotates the neighbouring row across the block; assigning a
+        # same-length slice rewrites only those B + 1 slots instead of shifting the tail twice.
+        orders = self.registered_orders
+        if delta > 0:
+            orders[start : end + 2] = [orders[end + 1], *orders[start : end + 1]]
+        else:
+            orders[start - 1 : end + 1] = [*orders[start : end + 1], orders[start - 1]]
+        self._mark_orders_changed()
 
         if self.view_anchor_index is not None:
             self.view_anchor_index += delta
@@ -629,12 +721,9 @@ class ReceiptOrderApp(App):
         self.order_selected_index = self.view_cursor_index
         self._refresh_orders()
         self._log_debug(
-            f"view_reorder_ok start={start} end={end} delta={delta} new_start={start + delta} new_end={end + delta}"
+            "view_reorder_ok start=%d end=%d delta=%d new_start=%d new_end=%d", start, end, delta, start + delta, end + delta
         )
 
-    def _is_group_row(self, row: RegisterRow) -> bool:
-        return isinstance(row, RegisterGroup)
-
     def _selected_row(self) -> RegisterRow | None:
         if self.order_selected_index is None:
             return None
@@ -652,25 +741,39 @@ class ReceiptOrderApp(App):
         return (self.order_selected_index, self.order_selected_index)
 
     def _selection_contains_group(self, start: int, end: int) -> bool:
-        return any(self._is_group_row(row) for row in self.registered_orders[start : end + 1])
+        return 1 in self._row_kinds()[start : end + 1]
+
+    def _item_display_prefix(self) -> list[int]:
+        """Prefix counts of plain items: entry i + 1 is the display number of a plain row at index i."""
+        if self._item_display_prefix_version != self._orders_version:
+            self._item_display_prefix_cache = list(accumulate((1 - kind for kind in self._row_kinds()), initial=0))
+            self._item_display_prefix_version = self._orders_version
+        return self._item_display_prefix_cache
+
+    def _row_kinds(self) -> bytearray:
+        """Return one byte per register row (1 for a group), rebuilt only when the register changes."""
+        if self._row_kinds_version != self._orders_version:
+            self._row_kinds_cache = bytearray(row.is_group for row in self.registered_orders)
+            self._row_kinds_version = self._orders_version
+        return self._row_kinds_cache
 
     def _allocate_group_id(self) -> int:
         group_id = self.next_group_id
         self.next_group_id += 1
         return group_id
 
-    def _recompute_next_group_id(self) -> None:
-        max_group_id = 0
-        for row in self.registered_orders:
-            if isinstance(row, RegisterGroup):
-                max_group_id = max(max_group_id, row.group_id)
-        self.next_group_id = max_group_id + 1
+    def _group_display_numbers(self) -> dict[int, int]:
+        """
+        Map each live group's stable `group_id` to the number shown as gN and printed.
 
-    def _close_group_id_gap(self, removed_group_id: int) -> None:
-        for row in self.registered_orders:
-            if isinstance(row, RegisterGroup) and row.group_id > removed_group_id:
-                row.group_id = max(1, row.group_id - 1)
-        self._recompute_next_group_id()
+        Group ids only ever grow, so ranking the live ids keeps the shown numbers dense
+        (1..n, in creation order) without renumbering groups when one is removed.
+        """
+        if self._group_display_version != self._orders_version:
+            live_ids = sorted(row.group_id for row in self.registered_orders if row.is_group)
+            self._group_display = {group_id: rank for rank, group_id in enumerate(live_ids, start=1)}
+            self._group_display_version = self._orders_version
+        return self._group_display
 
     def _group_selected_rows(self) -> None:
         if not self.registered_orders:
@@ -685,13 +788,14 @@ class ReceiptOrderApp(App):
 
         members: list[OrderEntry] = []
         for row in self.registered_orders[start : end + 1]:
-            if isinstance(row, OrderEntry):
+            if not row.is_group:
                 members.append(row)
         if not members:
             return
 
         group = RegisterGroup(group_id=self._allocate_group_id(), members=members)
         self.registered_orders[start : end + 1] = [group]
+        self._mark_orders_changed()
         self.order_selected_index = start
         if self.view_mode_active:
             self.view_anchor_index = start
@@ -699,7 +803,7 @@ class ReceiptOrderApp(App):
             self._exit_view_mode()
         else:
             self._refresh_orders()
-        self._log_debug(f"group_create id={group.group_id} start={start} count={len(members)}")
+        self._log_debug("group_create id=%d start=%d count=%d", group.group_id, start, len(members))
 
     def _ungroup_selected_group(self) -> None:
         if not self.registered_orders:
@@ -710,41 +814,43 @@ class ReceiptOrderApp(App):
         if idx is None or not (0 <= idx < len(self.registered_orders)):
             return
         row = self.registered_orders[idx]
-        if not isinstance(row, RegisterGroup):
+        if not row.is_group:
             return
 
         members = list(row.members)
         self.registered_orders[idx : idx + 1] = members
-        self._close_group_id_gap(row.group_id)
+        self._mark_orders_changed()
         self.order_selected_index = idx
         self.order_selected_member_index = None
         if self.view_mode_active:
             self.view_anchor_index = idx
             self.view_cursor_index = idx
         self._refresh_orders()
-        self._log_debug(f"group_remove id={row.group_id} at={idx} restored={len(members)}")
+        self._log_debug("group_remove id=%d at=%d restored=%d", row.group_id, idx, len(members))
 
     def _copy_for_submit(self, item: OrderEntry, group_id: int | None) -> OrderEntry:
-        copied = OrderEntry(
+        return OrderEntry(
             dish_id=item.dish_id,
             name=item.name,
             mode=item.mode,
-            selected_notes=set(item.selected_notes),
+            selected_notes=item.selected_notes,
             custom_notes=list(item.custom_notes),
             is_takeaway=item.is_takeaway,
+            group_id=group_id,
         )
-        if group_id is not None:
-            setattr(copied, "_group_id", group_id)
-        return copied
-
-    def _all_register_items(self) -> list[OrderEntry]:
-        items: list[OrderEntry] = []
-        for row in self.registered_orders:
-            if isinstance(row, RegisterGroup):
-                items.extend(row.members)
-            else:
-                items.append(row)
-        return items
+
+    def _all_register_items(self) -> tuple[OrderEntry, ...]:
+        """Return every register entry with groups flattened; cached per register version."""
+        if self._flat_items_version != self._orders_version:
+            items: list[OrderEntry] = []
+            for row in self.registered_orders:
+                if row.is_group:
+                    items.extend(row.members)
+                else:
+                    items.append(row)
+            self._flat_items = tuple(items)
+            self._flat_items_version = self._orders_version
+        return self._flat_items
 
     def _selection_targets_with_context(self) -> list[tuple[OrderEntry, bool]]:
         if self.view_mode_active:
@@ -752,7 +858,7 @@ class ReceiptOrderApp(App):
                 if self.view_group_row_index is None or not (0 <= self.view_group_row_index < len(self.registered_orders)):
                     return []
                 row = self.registered_orders[self.view_group_row_index]
-                if not isinstance(row, RegisterGroup):
+                if not row.is_group:
                     return []
                 bounds = self._view_member_range_bounds()
                 if bounds is None:
@@ -770,7 +876,7 @@ class ReceiptOrderApp(App):
                 return []
             targets: list[tuple[OrderEntry, bool]] = []
             for row in self.registered_orders[start : end + 1]:
-                if isinstance(row, RegisterGroup):
+                if row.is_group:
                     targets.extend((member, True) for member in row.members)
                 else:
                     targets.append((row, False))
@@ -784,7 +890,7 @@ class ReceiptOrderApp(App):
         row = self._selected_row()
         if row is None:
             return []
-        if isinstance(row, RegisterGroup):
+        if row.is_group:
             return [(member, True) for member in row.members]
         return [(row, False)]
 
@@ -799,6 +905,7 @@ class ReceiptOrderApp(App):
             return
         for item, _ in targets_with_ctx:
             item.is_takeaway = not item.is_takeaway
+        self._mark_orders_changed()
         self._refresh_orders()
 
     def _toggle_takeaway_whole_order(self) -> None:
@@ -808,17 +915,17 @@ class ReceiptOrderApp(App):
         make_takeaway = not all(item.is_takeaway for item in items)
         for item in items:
             item.is_takeaway = make_takeaway
+        self._mark_orders_changed()
         self._refresh_orders()
 
     def _flatten_register_rows_for_submit(self) -> list[OrderEntry]:
-        flattened: list[OrderEntry] = []
-        for row in self.registered_orders:
-            if isinstance(row, RegisterGroup):
-                for member in row.members:
-                    flattened.append(self._copy_for_submit(member, row.group_id))
-            else:
-                flattened.append(self._copy_for_submit(row, None))
-        return flattened
+        group_numbers = self._group_display_numbers()
+        copy_for_submit = self._copy_for_submit
+        return [
+            copy_for_submit(item, group_numbers[row.group_id] if row.is_group else None)
+            for row in self.registered_orders
+            for item in (row.members if row.is_group else (row,))
+        ]
 
     def _delete_selected_order(self) -> None:
         if not self.registered_orders or self.order_selected_index is None:
@@ -828,15 +935,15 @@ class ReceiptOrderApp(App):
         if selected_group_member is not None:
             group, member_idx = selected_group_member
             del group.members[member_idx]
+            self._mark_orders_changed()
             if group.members:
                 self.order_selected_member_index = min(member_idx, len(group.members) - 1)
                 self._refresh_orders()
                 return
             # Empty group behaves like deleting the group header itself.
             idx = self.order_selected_index
-            deleted_group_id = group.group_id
             del self.registered_orders[idx]
-            self._close_group_id_gap(deleted_group_id)
+            self._mark_orders_changed()
             if not self.registered_orders:
                 self.order_selected_index = None
                 self.order_selected_member_index = None
@@ -853,13 +960,8 @@ class ReceiptOrderApp(App):
             self._refresh_orders()
             return
 
-        deleting_group = isinstance(self.registered_orders[idx], RegisterGroup)
-        deleted_group_id = self.registered_orders[idx].group_id if deleting_group else None
         del self.registered_orders[idx]
-        if deleting_group:
-            self._close_group_id_gap(int(deleted_group_id))
-        else:
-            self._recompute_next_group_id()
+        self._mark_orders_changed()
 
         if not self.registered_orders:
             self.order_selected_index = None
@@ -882,7 +984,7 @@ class ReceiptOrderApp(App):
             if self.view_group_row_index is None or not (0 <= self.view_group_row_index < len(self.registered_orders)):
                 return
             row = self.registered_orders[self.view_group_row_index]
-            if not isinstance(row, RegisterGroup):
+            if not row.is_group:
                 return
             bounds = self._view_member_range_bounds()
             if bounds is None:
@@ -891,6 +993,7 @@ class ReceiptOrderApp(App):
             if not (0 <= start <= end < len(row.members)):
                 return
             del row.members[start : end + 1]
+            self._mark_orders_changed()
             did_delete = True
             if row.members:
                 next_member = min(start, len(row.members) - 1)
@@ -902,9 +1005,8 @@ class ReceiptOrderApp(App):
                 self._exit_view_mode()
                 return
             # Group emptied: remove group and fall back to normal mode selection.
-            removed_group_id = row.group_id
             del self.registered_orders[self.view_group_row_index]
-            self._close_group_id_gap(removed_group_id)
+            self._mark_orders_changed()
             if not self.registered_orders:
                 self.order_selected_index = None
                 self.order_selected_member_index = None
@@ -920,19 +1022,10 @@ class ReceiptOrderApp(App):
         if not (0 <= start <= end < len(self.registered_orders)):
             return
 
-        deleted_rows = self.registered_orders[start : end + 1]
-        deleted_group_ids = sorted(
-            {row.group_id for row in deleted_rows if isinstance(row, RegisterGroup)}
-        )
         del self.registered_orders[start : end + 1]
+        self._mark_orders_changed()
         did_delete = True
 
-        if deleted_group_ids:
-            for group_id in deleted_group_ids:
-                self._close_group_id_gap(group_id)
-        else:
-            self._recompute_next_group_id()
-
         if not self.registered_orders:
             self.order_selected_index = None
             self.order_selected_member_index = None
@@ -956,7 +1049,7 @@ class ReceiptOrderApp(App):
             group, member_idx = selected_group_member
             return group.members[member_idx]
         row = self._selected_row()
-        if row is None or isinstance(row, RegisterGroup):
+        if row is None or row.is_group:
             return None
         return row
 
@@ -967,7 +1060,7 @@ class ReceiptOrderApp(App):
             if not (0 <= self.view_group_row_index < len(self.registered_orders)):
                 return []
             row = self.registered_orders[self.view_group_row_index]
-            if not isinstance(row, RegisterGroup):
+            if not row.is_group:
                 return []
             bounds = self._view_member_range_bounds()
             if bounds is None:
@@ -975,7 +1068,7 @@ class ReceiptOrderApp(App):
             start, end = bounds
             if not (0 <= start <= end < len(row.members)):
                 return []
-            return list(row.members[start : end + 1])
+            return row.members[start : end + 1]
 
         bounds = self._view_range_bounds()
         if bounds is None:
@@ -984,31 +1077,30 @@ class ReceiptOrderApp(App):
         if not (0 <= start <= end < len(self.registered_orders)):
             return []
 
-        items: list[OrderEntry] = []
-        for row in self.registered_orders[start : end + 1]:
-            if isinstance(row, RegisterGroup):
-                return []
-            items.append(row)
-        return items
+        if self._selection_contains_group(start, end):
+            return []
+        return self.registered_orders[start : end + 1]
 
     def _can_open_view_notes(self, items: list[OrderEntry]) -> bool:
         if not items:
             return False
         first = items[0]
-        return all(
-            item.dish_id == first.dish_id
-            and item.selected_notes == first.selected_notes
-            and item.custom_notes == first.custom_notes
-            for item in items
-        )
+        first_dish_id = first.dish_id
+        first_notes = first.selected_notes
+        first_custom_notes = first.custom_notes
+        for item in items[1:]:
+            if item.dish_id != first_dish_id:
+                return False
+            if item.selected_notes != first_notes or item.custom_notes != first_custom_notes:
+                return False
+        return True
 
     def _open_notes_for_selected_order(self) -> None:
         entry = self._selected_order()
         if entry is None:
             return
         self._bulk_note_targets = None
-        self.ui_mode = "MODAL"
-        self.push_screen(NotesModal(entry, on_change=self._on_notes_modal_change))
+        self._push_modal(NotesModal(entry, on_change=self._on_notes_modal_change))
 
     def _open_notes_for_view_selection(self) -> None:
         if self.view_group_locked and self.order_selected_member_index is None:
@@ -1020,26 +1112,36 @@ class ReceiptOrderApp(App):
             self._bulk_note_targets = None
             return
         self._bulk_note_targets = items
-        self.ui_mode = "MODAL"
-        self.push_screen(NotesModal(items[0], on_change=self._on_notes_modal_change))
+        self._push_modal(NotesModal(items[0], on_change=self._on_notes_modal_change))
 
     def _on_notes_modal_change(self) -> None:
+        # NotesModal calls this right after dismiss(), so it doubles as the close hook.
+        self._modal_open = False
         was_bulk_notes = bool(self._bulk_note_targets)
         if self._bulk_note_targets:
-            source_notes = set(self._bulk_note_targets[0].selected_notes)
+            source_notes = self._bulk_note_targets[0].selected_notes
             source_custom_notes = list(self._bulk_note_targets[0].custom_notes)
             for item in self._bulk_note_targets[1:]:
-                item.selected_notes = set(source_notes)
+                item.selected_notes = source_notes
                 item.custom_notes = list(source_custom_notes)
         self._bulk_note_targets = None
+        # NotesModal edits entries in place, so treat every close as a content change.
+        self._mark_orders_changed()
         if was_bulk_notes and self.view_mode_active:
             self._exit_view_mode()
             return
         self._sync_ui_mode()
         self._refresh_orders()
 
+    def _push_modal(self, screen: NotesModal | OrderNumberModal, callback: Callable[[OrderConfirmData | None], None] | None = None) -> None:
+        # Key handlers gate on this flag instead of isinstance-checking self.screen on every event.
+        # Each modal's close path (_on_order_number_selected / _on_notes_modal_change) clears it.
+        self._modal_open = True
+        self.ui_mode = "MODAL"
+        self.push_screen(screen, callback)
+
     def _sync_ui_mode(self) -> None:
-        if isinstance(self.screen, (NotesModal, OrderNumberModal)):
+        if self._modal_open:
             self.ui_mode = "MODAL"
         elif self.view_mode_active:
             self.ui_mode = "VIEW"
@@ -1049,23 +1151,26 @@ class ReceiptOrderApp(App):
             self.ui_mode = "NORMAL"
 
     def _normalize_selection_state(self) -> None:
-        if self.order_selected_index is None:
+        selected = self.order_selected_index
+        if selected is None:
             self.order_selected_member_index = None
             return
-        if not (0 <= self.order_selected_index < len(self.registered_orders)):
+        if selected < 0 or selected >= len(self.registered_orders):
             self.order_selected_index = None
             self.order_selected_member_index = None
             return
-        row = self.registered_orders[self.order_selected_index]
-        if not isinstance(row, RegisterGroup):
+        row = self.registered_orders[selected]
+        if not row.is_group:
             self.order_selected_member_index = None
             return
-        if self.order_selected_member_index is None:
+        member = self.order_selected_member_index
+        if member is None:
             return
-        if not row.members:
+        member_count = len(row.members)
+        if not member_count:
             self.order_selected_member_index = None
             return
-        self.order_selected_member_index = max(0, min(len(row.members) - 1, self.order_selected_member_index))
+        self.order_selected_member_index = 0 if member < 0 else (member_count - 1 if member >= member_count else member)
 
     def _enter_view_mode(self) -> None:
         if self.input_state != "normal":
@@ -1084,7 +1189,7 @@ class ReceiptOrderApp(App):
         self.view_member_cursor_index = None
         if self.order_selected_member_index is not None:
             row = self.registered_orders[self.order_selected_index]
-            if isinstance(row, RegisterGroup) and 0 <= self.order_selected_member_index < len(row.members):
+            if row.is_group and 0 <= self.order_selected_member_index < len(row.members):
                 self.view_group_locked = True
                 self.view_group_row_index = self.order_selected_index
                 self.view_member_anchor_index = self.order_selected_member_index
@@ -1101,7 +1206,7 @@ class ReceiptOrderApp(App):
         self._sync_ui_mode()
         self._refresh_orders()
         self._log_debug(
-            f"view_mode_enter anchor={self.view_anchor_index} cursor={self.view_cursor_index} rows={len(self.registered_orders)}"
+            "view_mode_enter anchor=%s cursor=%s rows=%d", self.view_anchor_index, self.view_cursor_index, len(self.registered_orders)
         )
 
     def _exit_view_mode(self) -> None:
@@ -1128,24 +1233,28 @@ class ReceiptOrderApp(App):
         self._log_debug("view_mode_exit")
 
     def _move_view_cursor(self, delta: int) -> None:
-        if not self.view_mode_active or not self.registered_orders:
+        row_count = len(self.registered_orders)
+        if not self.view_mode_active or not row_count:
             return
         if self.view_group_locked:
-            if self.view_group_row_index is None or not (0 <= self.view_group_row_index < len(self.registered_orders)):
+            group_idx = self.view_group_row_index
+            if group_idx is None or group_idx < 0 or group_idx >= row_count:
                 return
-            row = self.registered_orders[self.view_group_row_index]
-            if not isinstance(row, RegisterGroup) or not row.members:
+            row = self.registered_orders[group_idx]
+            if not row.is_group or not row.members:
                 return
-            if self.view_member_cursor_index is None:
-                self.view_member_cursor_index = 0
-            self.view_member_cursor_index = max(0, min(len(row.members) - 1, self.view_member_cursor_index + delta))
-            self.order_selected_index = self.view_group_row_index
-            self.order_selected_member_index = self.view_member_cursor_index
+            member_count = len(row.members)
+            cursor = (self.view_member_cursor_index or 0) + delta
+            cursor = 0 if cursor < 0 else (member_count - 1 if cursor >= member_count else cursor)
+            self.view_member_cursor_index = cursor
+            self.order_selected_index = group_idx
+            self.order_selected_member_index = cursor
             self._refresh_orders()
             return
         if self.view_cursor_index is None:
             self.view_cursor_index = self.order_selected_index if self.order_selected_index is not None else 0
-        self.view_cursor_index = max(0, min(len(self.registered_orders) - 1, self.view_cursor_index + delta))
+        cursor = self.view_cursor_index + delta
+        self.view_cursor_index = 0 if cursor < 0 else (row_count - 1 if cursor >= row_count else cursor)
         self.order_selected_index = self.view_cursor_index
         self.order_selected_member_index = None
         self._refresh_orders()
@@ -1161,6 +1270,7 @@ class ReceiptOrderApp(App):
         self._refresh_orders()
 
     def _jump_view_cursor_to_bottom(self) -> None:
+        self._log_debug("view_mode_jump_bottom_G")
         if not self.registered_orders:
             return
         if self.view_group_locked:
@@ -1199,38 +1309,49 @@ class ReceiptOrderApp(App):
         return max(1, height)
 
     def _window_bounds(self, total: int, rows: int, selected: int | None) -> tuple[int, int]:
-        if total <= 0:
-            return (0, 0)
-
-        rows = max(1, rows)
+        if rows < 1:
+            rows = 1
         if total <= rows:
             return (0, total)
-
         if selected is None:
+            return (0, rows)
+        # Center the selection, clamped so the window never runs past either end.
+        start = selected - (rows >> 1)
+        limit = total - rows
+        if start < 0:
             start = 0
-        else:
-            half = rows // 2
-            start = selected - half
-            start = max(0, start)
-            start = min(start, total - rows)
-
+        elif start > limit:
+            start = limit
         return (start, start + rows)
 
-    def _append_item_with_notes(self, lines: Text, item: OrderEntry, prefix: str, note_indent: str) -> None:
-        lines.append(prefix)
+    def _append_item_with_notes(
+        self, parts: list[str], spans: list[Span], pos: int, item: OrderEntry, prefix: str, note_indent: str
+    ) -> int:
+        """Append one item (and its note line) as plain fragments plus spans; return the new end offset."""
+        parts.append(prefix)
+        pos += len(prefix)
         if item.is_takeaway:
-            lines.append("TAW ", style="bold yellow")
-        lines.append_text(format_order_label(item))
-        has_notes = bool(item.selected_notes or item.custom_notes)
-        if has_notes:
-            lines.append(f"\n{note_indent}")
-            lines.append_text(format_all_note_tags(item))
+            parts.append("TAW ")
+            spans.append(Span(pos, pos + 4, "bold yellow"))
+            pos += 4
+        pos = self._append_text_fragment(parts, spans, pos, format_order_label(item))
+        if item.selected_notes or item.custom_notes:
+            parts.append(f"\n{note_indent}")
+            pos += 1 + len(note_indent)
+            pos = self._append_text_fragment(parts, spans, pos, format_all_note_tags(item))
+        return pos
+
+    def _append_text_fragment(self, parts: list[str], spans: list[Span], pos: int, text: Text) -> int:
+        plain = text.plain
+        parts.append(plain)
+        spans.extend(Span(pos + span.start, pos + span.end, span.style) for span in text.spans)
+        return pos + len(plain)
+
+    def _mark_orders_changed(self) -> None:
+        self._orders_version += 1
 
     def _refresh_orders(self) -> None:
-        try:
-            orders_widget = self.query_one("#orders-list", Static)
-        except NoMatches:
-            return
+        # Selection state is normalized right away; only the render waits for the next flush.
         if not self.registered_orders:
             if self.view_mode_active:
                 self.view_mode_active = False
@@ -1245,98 +1366,159 @@ class ReceiptOrderApp(App):
                 self._sync_ui_mode()
             self.order_selected_index = None
             self.order_selected_member_index = None
+        else:
+            # A selection already normalized against this register version is still valid.
+            selection_key = (self._orders_version, self.order_selected_index, self.order_selected_member_index)
+            if selection_key != self._normalized_selection_key:
+                if self.order_selected_index is not None and self.order_selected_index >= len(self.registered_orders):
+                    self.order_selected_index = len(self.registered_orders) - 1
+                self._normalize_selection_state()
+                self._normalized_selection_key = (
+                    self._orders_version,
+                    self.order_selected_index,
+                    self.order_selected_member_index,
+                )
+        self._orders_dirty = True
+        self._schedule_refresh()
+
+    def _build_order_row_fragment(self, idx: int) -> tuple[str, tuple[Span, ...], int, list[tuple[int, int, int]]]:
+        """Render one register row without highlight; cached until the register changes."""
+        row = self.registered_orders[idx]
+        parts: list[str] = []
+        spans: list[Span] = []
+        if row.is_group:
+            header = f"g{self._group_display_numbers()[row.group_id]}"
+            parts.append(header)
+            pos = len(header)
+            member_offsets: list[tuple[int, int, int]] = []
+            for member_idx, member in enumerate(row.members):
+                parts.append("\n")
+                member_start = pos + 1
+                member_prefix = f"  {member_idx + 1}. "
+                pos = self._append_item_with_notes(parts, spans, member_start, member, member_prefix, " " * len(member_prefix))
+                member_offsets.append((member_idx, member_start, pos))
+            return ("".join(parts), tuple(spans), len(header), member_offsets)
+
+        display_idx = self._item_display_prefix()[idx + 1]
+        prefix = f"{display_idx}. "
+        pos = self._append_item_with_notes(parts, spans, 0, row, prefix, " " * len(prefix))
+        return ("".join(parts), tuple(spans), pos, [])
+
+    def _build_orders_body(
+        self, start: int, end: int
+    ) -> tuple[str, tuple[Span, ...], list[tuple[int, bool, int, int, int, list[tuple[int, int, int]]]]]:
+        """Assemble the unhighlighted orders text for rows [start, end) plus each row's offsets."""
+        parts: list[str] = []
+        spans: list[Span] = []
+        row_layout: list[tuple[int, bool, int, int, int, list[tuple[int, int, int]]]] = []
+        row_kinds = self._row_kinds()
+        pos = 0
+        if start > 0:
+            parts.append(_TOP_ELLIPSIS)
+            spans.append(_TOP_ELLIPSIS_SPAN)
+            pos = len(_TOP_ELLIPSIS)
+
+        if self._order_row_cache_version != self._orders_version:
+            self._order_row_cache.clear()
+            self._order_row_cache_version = self._orders_version
+
+        for idx in range(start, end):
+            if idx > start:
+                parts.append("\n")
+                pos += 1
+
+            row_start = pos
+            fragment = self._order_row_cache.get(idx)
+            if fragment is None:
+                fragment = self._build_order_row_fragment(idx)
+                self._order_row_cache[idx] = fragment
+            row_plain, row_spans, header_len, member_offsets = fragment
+            parts.append(row_plain)
+            spans.extend(Span(row_start + span.start, row_start + span.end, span.style) for span in row_spans)
+            pos += len(row_plain)
+            member_blocks = [
+                (member_idx, row_start + m_start, row_start + m_end) for member_idx, m_start, m_end in member_offsets
+            ]
+            row_layout.append(
+                (idx, bool(row_kinds[idx]), row_start, pos, row_start + header_len, member_blocks)
+            )
+
+        if end < len(self.registered_orders):
+            parts.append(_BOTTOM_ELLIPSIS)
+            spans.append(Span(pos, pos + len(_BOTTOM_ELLIPSIS), _ELLIPSIS_STYLE))
+
+        return ("".join(parts), tuple(spans), row_layout)
+
+    def _render_orders(self) -> None:
+        orders_widget = self._orders_widget
+        if not self.registered_orders:
             orders_widget.update("(no items yet)")
             return
 
-        if self.order_selected_index is not None and self.order_selected_index >= len(self.registered_orders):
-            self.order_selected_index = len(self.registered_orders) - 1
-        self._normalize_selection_state()
-
         visible_rows = self._visible_rows(orders_widget)
         start, end = self._window_bounds(len(self.registered_orders), visible_rows, self.order_selected_index)
         view_bounds = self._view_range_bounds()
         view_member_bounds = self._view_member_range_bounds()
 
-        lines = Text()
-        if start > 0:
-            lines.append("⋮\n", style="dim")
-
-        item_display_index_by_row: dict[int, int] = {}
-        running_item_index = 0
-        for row_idx, row_obj in enumerate(self.registered_orders):
-            if isinstance(row_obj, RegisterGroup):
-                continue
-            running_item_index += 1
-            item_display_index_by_row[row_idx] = running_item_index
-
-        for idx in range(start, end):
-            if idx > start:
-                lines.append("\n")
-
-            row_start = len(lines)
-            row = self.registered_orders[idx]
-            if isinstance(row, RegisterGroup):
-                header_start = len(lines)
-                lines.append(f"g{row.group_id}")
-                header_end = len(lines)
-                member_blocks: list[tuple[int, int, int]] = []
-                for member_idx, member in enumerate(row.members):
-                    lines.append("\n")
-                    member_start = len(lines)
-                    member_prefix = f"  {member_idx + 1}. "
-                    self._append_item_with_notes(lines, member, member_prefix, " " * len(member_prefix))
-                    member_end = len(lines)
-                    member_blocks.append((member_idx, member_start, member_end))
-            else:
-                display_idx = item_display_index_by_row.get(idx, idx + 1)
-                prefix = f"{display_idx}. "
-                self._append_item_with_notes(lines, row, prefix, " " * len(prefix))
-
-            row_end = len(lines)
-            if isinstance(row, RegisterGroup):
-                if self.view_group_locked and self.view_group_row_index == idx and view_member_bounds is not None:
-                    selected_member_idx = self.order_selected_member_index
-                    if selected_member_idx is None:
-                        lines.stylize("reverse", header_start, header_end)
-                    else:
-                        start_m, end_m = view_member_bounds
-                        for member_idx, m_start, m_end in member_blocks:
-                            if start_m <= member_idx <= end_m:
-                                lines.stylize("reverse", m_start, m_end)
-                elif view_bounds is not None:
-                    if view_bounds[0] <= idx <= view_bounds[1]:
-                        lines.stylize("reverse", row_start, row_end)
-                elif idx == self.order_selected_index:
-                    if self.order_selected_member_index is None:
-                        lines.stylize("reverse", header_start, header_end)
-                    else:
-                        for member_idx, m_start, m_end in member_blocks:
-                            if member_idx == self.order_selected_member_index:
-                                lines.stylize("reverse", m_start, m_end)
-                                break
-            else:
-                is_selected = False
-                if view_bounds is not None:
-                    is_selected = view_bounds[0] <= idx <= view_bounds[1]
+        # The assembled body only depends on the register contents and the visible window, so
+        # cursor-only moves reuse it and just recompute the highlight spans below.
+        body_key = (self._orders_version, start, end)
+        cached_body = self._orders_body_cache
+        if cached_body is None or cached_body[0] != body_key:
+            cached_body = (body_key, *self._build_orders_body(start, end))
+            self._orders_body_cache = cached_body
+        _, body, base_spans, row_layout = cached_body
+
+        # Resolve what gets highlighted once, so the per-row loop is only range/equality tests.
+        # Whole rows: the view range if active, else the single selected row.
+        if view_bounds is not None:
+            highlighted_rows = range(view_bounds[0], view_bounds[1] + 1)
+        elif self.order_selected_index is not None:
+            highlighted_rows = range(self.order_selected_index, self.order_selected_index + 1)
+        else:
+            highlighted_rows = range(0)
+        # Group rows: which row highlights members (None = header only) instead of the whole block.
+        locked_group_row = None
+        highlighted_members: range | None = None
+        if self.view_group_locked and view_member_bounds is not None:
+            locked_group_row = self.view_group_row_index
+            if self.order_selected_member_index is not None:
+                highlighted_members = range(view_member_bounds[0], view_member_bounds[1] + 1)
+        elif view_bounds is None and self.order_selected_member_index is not None:
+            locked_group_row = self.order_selected_index
+            highlighted_members = range(self.order_selected_member_index, self.order_selected_member_index + 1)
+        elif view_bounds is None:
+            locked_group_row = self.order_selected_index
+
+        spans = list(base_spans)
+        for idx, is_group, row_start, row_end, header_end, member_blocks in row_layout:
+            if is_group and idx == locked_group_row:
+                if highlighted_members is None:
+                    spans.append(Span(row_start, header_end, "reverse"))
                 else:
-                    is_selected = idx == self.order_selected_index
-                if is_selected:
-                    lines.stylize("reverse", row_start, row_end)
-
-        if end < len(self.registered_orders):
-            lines.append("\n⋮", style="dim")
+                    for member_idx, m_start, m_end in member_blocks:
+                        if member_idx in highlighted_members:
+                            spans.append(Span(m_start, m_end, "reverse"))
+            elif idx in highlighted_rows:
+                spans.append(Span(row_start, row_end, "reverse"))
 
-        orders_widget.update(lines)
+        orders_widget.update(Text(body, spans=spans))
 
     def _refresh_search(self) -> None:
-        self._refresh_search_bar()
-        if self.input_state == "normal":
-            self._refresh_results([])
-            return
-        self._refresh_results(self._filtered_results())
+        self._search_bar_dirty = True
+        self._results_dirty = True
+        self._schedule_refresh()
 
-    def _refresh_search_bar(self) -> None:
-        bar = self.query_one("#search-bar", Static)
+    def _refresh_results(self) -> None:
+        self._results_dirty = True
+        self._schedule_refresh()
+
+    def _render_search_bar(self) -> None:
+        state = (self.input_state, self.mode, self.query, self.system_status)
+        if state == self._search_bar_state:
+            return
+        self._search_bar_state = state
+        bar = self._search_bar_widget
         if self.input_state == "normal":
             status = self.system_status or "Ready"
             bar.update(f"Press R, G, or S to search. Ctrl+S submit/print.\\n{status}")
@@ -1348,12 +1530,14 @@ class ReceiptOrderApp(App):
         text.append(f": {shown_query}")
         bar.update(text)
 
-    def _refresh_results(self, results: list[MenuItem]) -> None:
-        results_widget = self.query_one("#results", Static)
+    def _render_results(self) -> None:
+        results_widget = self._results_widget
         if self.input_state == "normal":
             results_widget.update("")
             return
 
+        results = self._filtered_results()
+
         if not results:
             results_widget.update("No results")
             return
@@ -1363,43 +1547,69 @@ class ReceiptOrderApp(App):
 
         visible_rows = self._visible_rows(results_widget)
         start, end = self._window_bounds(len(results), visible_rows, self.selected_index)
-
-        lines = Text()
+        typing_other = self.mode == "S" and self.s_other_typing_active
+
+        cached = self._results_render_cache
+        if cached is not None and not typing_other and cached[0] is results and cached[1:3] == (start, end):
+            # Same window as last time: only the two pointer prefixes can differ, and both are 2 chars wide.
+            _, _, _, body, row_offsets, spans, pointer_idx = cached
+            if pointer_idx != self.selected_index:
+                old_at = row_offsets[pointer_idx - start]
+                body = f"{body[:old_at]}  {body[old_at + 2:]}"
+                new_at = row_offsets[self.selected_index - start]
+                body = f"{body[:new_at]}➤ {body[new_at + 2:]}"
+                self._results_render_cache = (results, start, end, body, row_offsets, spans, self.selected_index)
+            results_widget.update(Text(body, spans=list(spans)))
+            return
+
+        lines: list[str] = []
+        spans: list[Span] = []
+        row_offsets: list[int] = []
+        top = ""
+        pos = 0
         if start > 0:
-            lines.append("⋮\n", style="dim")
+            top = _TOP_ELLIPSIS
+            spans.append(_TOP_ELLIPSIS_SPAN)
+            pos = len(_TOP_ELLIPSIS)
 
         for idx in range(start, end):
-            if idx > start:
-                lines.append("\n")
             pointer = "➤ " if idx == self.selected_index else "  "
             item = results[idx]
             if (
                 self.input_state == "active"
-                and self.mode == "S"
-                and self.s_other_typing_active
+                and typing_other
                 and idx == self.selected_index
                 and item.dish_id == "other_side"
             ):
-                lines.append(f"{pointer}Other item: {self.s_other_input_value}|")
+                line = f"{pointer}Other item: {self.s_other_input_value}|"
             else:
-                lines.append(f"{pointer}{item.name}")
+                line = f"{pointer}{item.name}"
+            lines.append(line)
+            row_offsets.append(pos)
+            pos += len(line) + 1
 
+        body = top + "\n".join(lines)
         if end < len(results):
-            lines.append("\n⋮", style="dim")
+            spans.append(Span(len(body), len(body) + len(_BOTTOM_ELLIPSIS), _ELLIPSIS_STYLE))
+            body += _BOTTOM_ELLIPSIS
 
-        results_widget.update(lines)
+        self._results_render_cache = (
+            None if typing_other else (results, start, end, body, row_offsets, tuple(spans), self.selected_index)
+        )
+        results_widget.update(Text(body, spans=spans))
 
     def _refresh_footer(self) -> None:
-        try:
-            footer = self.query_one("#mode-footer", Static)
-        except NoMatches:
-            return
+        self._footer_dirty = True
+        self._schedule_refresh()
+
+    def _render_footer(self) -> None:
+        footer = self._footer_widget
         if self.ui_mode == "SEARCH":
             footer.update(f"Mode: SEARCH ({self._search_mode_label()})")
             return
         footer.update(f"Mode: {self.ui_mode}")
 
-    def _is_s_other_row_selected(self, results: list[MenuItem]) -> bool:
+    def _is_s_other_row_selected(self, results: tuple[MenuItem, ...]) -> bool:
         if self.mode != "S":
             return False
         if not (0 <= self.selected_index < len(results)):
@@ -1409,14 +1619,14 @@ class ReceiptOrderApp(App):
     def _start_s_other_typing(self) -> None:
         self.s_other_typing_active = True
         self.s_other_input_value = ""
-        self._refresh_results(self._filtered_results())
+        self._refresh_results()
 
     def _cancel_s_other_typing(self, clear_input: bool = True) -> None:
         self.s_other_typing_active = False
         if clear_input:
             self.s_other_input_value = ""
         if self.input_state == "active":
-            self._refresh_results(self._filtered_results())
+            self._refresh_results()
 
     def _reset_s_active_search_view(self) -> None:
         self.query = ""
@@ -1430,7 +1640,64 @@ class ReceiptOrderApp(App):
 
         if normalized:
             self.registered_orders.append(OrderEntry(dish_id="other_side", name=normalized, mode="S"))
+            self._mark_orders_changed()
             self.order_selected_index = len(self.registered_orders) - 1
             self.order_selected_member_index = None
             self._refresh_orders()
         self._reset_s_active_search_view()
+
+    def _stub_line_view_mode(self) -> None:
+        self.view_selection_kind = "LINE"
+        self.system_status = "Shift+V not implemented yet"
+        self._log_debug("view_mode_shift_v_stub")
+
+    def _append_tteokbokki(self) -> None:
+        self.registered_orders.append(OrderEntry(dish_id="tteokbokki", name=display_name_for_dish("tteokbokki")))
+        self._mark_orders_changed()
+        self.order_selected_index = len(self.registered_orders) - 1
+        self.order_selected_member_index = None
+        self._refresh_orders()
+
+    def _enter_search_mode(self, mode: str) -> None:
+        self.mode = mode
+        self.input_state = "active"
+        self._sync_ui_mode()
+        self.query = ""
+        self.selected_index = 0
+        self._refresh_search()
+
+    _NORMAL_KEY_DISPATCH: dict[str, Callable[[ReceiptOrderApp, str], None]] = {
+        "v": lambda app, _char: app._enter_view_mode(),
+        "V": lambda app, _char: app._stub_line_view_mode(),
+        "c": lambda app, _char: app._group_selected_rows(),
+        "C": lambda app, _char: app._ungroup_selected_group(),
+        "a": lambda app, _char: app._toggle_takeaway_selection(),
+        "A": lambda app, _char: app._toggle_takeaway_whole_order(),
+        "t": lambda app, _char: app._append_tteokbokki(),
+        "T": lambda app, _char: app._append_tteokbokki(),
+        "d": lambda app, _char: app._delete_selected_order(),
+        "D": lambda app, _char: app._delete_selected_order(),
+        "J": lambda app, _char: app._reorder_selected_row(1),
+        "K": lambda app, _char: app._reorder_selected_row(-1),
+        "j": lambda app, _char: app._move_order_selection(1),
+        "k": lambda app, _char: app._move_order_selection(-1),
+        "n": lambda app, _char: app._open_notes_for_selected_order(),
+        "N": lambda app, _char: app._open_notes_for_selected_order(),
+        **{char: lambda app, char: app._enter_search_mode(char.upper()) for char in "grsGRS"},
+    }
+
+    _VIEW_KEY_DISPATCH: dict[str, Callable[[ReceiptOrderApp], None]] = {
+        "N": lambda app: app._open_notes_for_view_selection(),
+        "n": lambda app: app._open_notes_for_view_selection(),
+        "A": lambda app: app._toggle_takeaway_whole_order(),
+        "a": lambda app: app._toggle_takeaway_selection(),
+        "J": lambda app: app._reorder_view_selection_block(1),
+        "K": lambda app: app._reorder_view_selection_block(-1),
+        "j": lambda app: app._move_view_cursor(1),
+        "k": lambda app: app._move_view_cursor(-1),
+        "C": lambda app: app._ungroup_selected_group(),
+        "c": lambda app: app._group_selected_rows(),
+        "d": lambda app: app._delete_view_selected_rows(),
+        "D": lambda app: app._delete_view_selected_rows(),
+        "G": lambda app: app._jump_view_cursor_to_bottom(),
+    }
@@ -2,43 +2,61 @@
 
 from __future__ import annotations
 
+from functools import lru_cache
+
 from rich.text import Text
 
-from app.data import DISH_NOTE_OVERRIDES, MODE_NOTE_DEFAULTS, NOTE_CATALOG
+from app.data import DISH_NOTE_OVERRIDES, MODE_NOTE_DEFAULTS, NOTE_CATALOG, ordered_note_ids
 from app.models import OrderEntry
 
 
+_BADGE_STYLES: dict[str, str] = {
+    "R": "bold #ffffff on #b23a48",
+    "S": "bold #ffffff on #2f6db5",
+}
+_DEFAULT_BADGE_STYLE = "bold #0b1f0f on #5fbf72"
+
+
 def badge_style(mode: str) -> str:
     """Return a consistent badge style for category tags."""
-    if mode == "R":
-        return "bold #ffffff on #b23a48"
-    if mode == "S":
-        return "bold #ffffff on #2f6db5"
-    return "bold #0b1f0f on #5fbf72"
+    return _BADGE_STYLES.get(mode, _DEFAULT_BADGE_STYLE)
 
 
 def format_order_label(entry: OrderEntry) -> Text:
-    """Render an order label with an optional colored mode tag."""
+    """
+    Render an order label with an optional colored mode tag.
+
+    Like `format_all_note_tags`, the result is cached and shared; append or copy it rather
+    than mutating it in place.
+    """
+    return _order_label(entry.mode, entry.name)
+
+
+@lru_cache(maxsize=512)
+def _order_label(mode: str | None, name: str) -> Text:
     text = Text()
-    if entry.mode in {"R", "G", "S"}:
-        text.append(entry.mode, style=badge_style(entry.mode))
-        text.append(f" {entry.name}")
+    if mode in {"R", "G", "S"}:
+        text.append(mode, style=badge_style(mode))
+        text.append(f" {name}")
     else:
-        text.append(entry.name)
+        text.append(name)
     return text
 
 
-def available_notes_for_order(entry: OrderEntry) -> list[str]:
+def available_notes_for_order(entry: OrderEntry) -> tuple[str, ...]:
     """Resolve which note IDs are available for the given dish."""
-    note_ids = list(MODE_NOTE_DEFAULTS.get(entry.mode or "", []))
-    overrides = DISH_NOTE_OVERRIDES.get(entry.dish_id, {})
-    for note_id in overrides.get("remove", []):
-        if note_id in note_ids:
-            note_ids.remove(note_id)
-    for note_id in overrides.get("add", []):
-        if note_id not in note_ids:
-            note_ids.append(note_id)
-    return [note_id for note_id in note_ids if note_id in NOTE_CATALOG]
+    return _available_notes(entry.mode, entry.dish_id)
+
+
+@lru_cache(maxsize=None)
+def _available_notes(mode: str | None, dish_id: str) -> tuple[str, ...]:
+    # Insertion-ordered dict: hashed membership while keeping the defaults-then-additions display order.
+    note_ids = dict.fromkeys(MODE_NOTE_DEFAULTS.get(mode or "", ()))
+    overrides = DISH_NOTE_OVERRIDES.get(dish_id, {})
+    for note_id in overrides.get("remove", ()):
+        note_ids.pop(note_id, None)
+    note_ids.update(dict.fromkeys(overrides.get("add", ())))
+    return tuple(note_id for note_id in note_ids if note_id in NOTE_CATALOG)
 
 
 def format_note_tags(note_ids: list[str]) -> Text:
@@ -52,11 +70,21 @@ def format_note_tags(note_ids: list[str]) -> Text:
 
 
 def format_all_note_tags(entry: OrderEntry) -> Text:
-    """Render built-in and custom selected notes as compact tags."""
+    """
+    Render built-in and custom selected notes as compact tags.
+
+    The result is cached per distinct note selection and shared between calls, so append
+    it with `Text.append_text` (or copy it) instead of mutating it in place.
+    """
+    return _all_note_tags(entry.selected_notes, tuple(entry.custom_notes))
+
+
+@lru_cache(maxsize=256)
+def _all_note_tags(selected_notes: frozenset[str], custom_notes: tuple[str, ...]) -> Text:
     text = Text()
     labels: list[str] = []
-    labels.extend(NOTE_CATALOG[note_id] for note_id in NOTE_CATALOG if note_id in entry.selected_notes)
-    labels.extend(entry.custom_notes)
+    labels.extend(NOTE_CATALOG[note_id] for note_id in ordered_note_ids(selected_notes))
+    labels.extend(custom_notes)
     for idx, label in enumerate(labels):
         if idx > 0:
             text.append(" ")
@@ -1,31 +1,50 @@
+from functools import lru_cache
+
 from escpos.printer import Usb
 from PIL import Image, ImageDraw, ImageFont
 
-p = Usb(0x28e9, 0x0289)
+from app.printer import raster_payloads, send_raster
 
-text = "R-TOFU  ♥"
 printer_width = 384  # pixels
 font_size = 72        # bigger = larger letters
+canvas_height = font_size + 20
+
+
+@lru_cache(maxsize=1)
+def _font() -> ImageFont.FreeTypeFont:
+    # Use a TrueType font (system font or any TTF file you have)
+    # macOS default example:
+    return ImageFont.truetype("/System/Library/Fonts/SFNS.ttf", font_size)
+
+
+@lru_cache(maxsize=1)
+def _canvas() -> tuple[Image.Image, ImageDraw.ImageDraw]:
+    # Create canvas tall enough for your font; it is cleared and reused for every label.
+    img = Image.new("1", (printer_width, canvas_height), color=1)
+    return img, ImageDraw.Draw(img)
+
+
+def print_label(p: Usb, text: str) -> None:
+    font = _font()
+    img, draw = _canvas()
+    draw.rectangle((0, 0, printer_width, canvas_height), fill=1)
 
-# Use a TrueType font (system font or any TTF file you have)
-# macOS default example:
-font = ImageFont.truetype("/System/Library/Fonts/SFNS.ttf", font_size)
+    # Get text bounding box
+    bbox = draw.textbbox((0, 0), text, font=font)
+    text_width = bbox[2] - bbox[0]
+    text_height = bbox[3] - bbox[1]
 
-# Create canvas tall enough for your font
-img = Image.new("1", (printer_width, font_size + 20), color=1)
-draw = ImageDraw.Draw(img)
+    # Center text
+    x = (printer_width - text_width) // 2
+    y = (canvas_height - text_height) // 2
 
-# Get text bounding box
-bbox = draw.textbbox((0, 0), text, font=font)
-text_width = bbox[2] - bbox[0]
-text_height = bbox[3] - bbox[1]
+    draw.text((x, y), text, font=font, fill=0)
 
-# Center text
-x = (printer_width - text_width) // 2
-y = (font_size + 20 - text_height) // 2
+    # Print: the canvas is already byte-aligned 1-bit, so send packed GS v 0 rows directly.
+    for payload in raster_payloads(img):
+        send_raster(p, payload)
+    p.cut()
 
-draw.text((x, y), text, font=font, fill=0)
 
-# Print
-p.image(img)
-p.cut()
+if __name__ == "__main__":
+    print_label(Usb(0x28e9, 0x0289), "R-TOFU  ♥")